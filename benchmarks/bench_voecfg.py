@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+
+"""Benchmarks for loading configs at scale.
+
+Times BaseConfig construction, _get_members, _setup, load_from_environment
+and as_dict over a generated matrix of configs: wide configs, deeply nested
+SubConfigs, large JSON and TOML files and large environments, in strict and
+non-strict mode.
+
+Results are written as JSON, so they can be compared between runs:
+
+    python benchmarks/bench_voecfg.py --output bench.json
+    python benchmarks/bench_voecfg.py --quick --filter wide
+"""
+
+# ruff: noqa: T201, SLF001
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from voecfg import BaseConfig, Environ, SubConfig, file_cache
+from voecfg.utils import load_from_environment
+
+try:
+    import toml
+except ImportError:  # pragma: no cover
+    toml = None  # type: ignore[assignment]
+
+PREFIX = "bench"
+
+
+def make_wide(fields: int, *, strict: bool = True, **options: Any) -> type[BaseConfig]:
+    """Return a config class with the given number of fields on one level.
+
+    A quarter each are int, str and bool fields with defaults, and list[int]
+    fields without.
+    """
+    namespace: dict[str, Any] = {
+        "_prefix": PREFIX,
+        "_strict": strict,
+        "__annotations__": {},
+        **options,
+    }
+    for index in range(fields):
+        kind = index % 4
+        name = f"field_{index}"
+        if kind == 0:
+            namespace[name] = index
+        elif kind == 1:
+            namespace[name] = f"value {index}"
+        elif kind == 2:  # noqa: PLR2004
+            namespace[name] = False
+        else:
+            namespace["__annotations__"][name] = list[int]
+    return type("WideConfig", (BaseConfig,), namespace)
+
+
+def make_deep(depth: int, fields: int = 4, **options: Any) -> type[BaseConfig]:
+    """Return a config class with SubConfigs nested depth levels deep."""
+    sub: SubConfig | None = None
+    for level in reversed(range(depth)):
+        namespace: dict[str, Any] = {"_prefix": f"level{level}", **options}
+        namespace.update({f"value_{i}": i for i in range(fields)})
+        if sub is not None:
+            namespace["child"] = sub
+        sub = type(f"Level{level}Config", (SubConfig,), namespace)()
+
+    return type(
+        "DeepConfig",
+        (BaseConfig,),
+        {"_prefix": PREFIX, "child": sub, **options},
+    )
+
+
+def wide_document(fields: int, noise: int = 0) -> dict[str, Any]:
+    """Return a config document for make_wide, plus noise unrelated keys."""
+    values: dict[str, Any] = {}
+    for index in range(fields):
+        kind = index % 4
+        if kind == 0:
+            values[f"field_{index}"] = index + 1
+        elif kind == 1:
+            values[f"field_{index}"] = f"file {index}"
+        elif kind == 2:  # noqa: PLR2004
+            values[f"field_{index}"] = True
+        else:
+            values[f"field_{index}"] = [index, index + 1]
+    document: dict[str, Any] = {PREFIX: values}
+    for index in range(noise):
+        document[f"other_{index}"] = {"name": f"service {index}", "ports": [1, 2]}
+    return document
+
+
+def wide_environ(fields: int, noise: int = 0) -> dict[str, str]:
+    """Return environment variables for the list fields of make_wide."""
+    environ = {
+        f"{PREFIX}_FIELD_{index}".upper(): json.dumps([index])
+        for index in range(3, fields, 4)
+    }
+    for index in range(noise):
+        environ[f"NOISE_VARIABLE_{index}"] = f"value {index}"
+    return environ
+
+
+@contextmanager
+def patched_environ(environ: dict[str, str]) -> Iterator[None]:
+    """Temporarily add variables to os.environ."""
+    old = dict(os.environ)
+    os.environ.update(environ)
+    try:
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(old)
+
+
+class Runner:
+    """Time benchmarks and collect the results."""
+
+    def __init__(self, min_time: float, repeat: int, name_filter: str) -> None:
+        self.min_time = min_time
+        self.repeat = repeat
+        self.name_filter = name_filter
+        self.results: list[dict[str, Any]] = []
+
+    def bench(self, name: str, func: Callable[[], Any], **params: Any) -> None:
+        """Time func and record the result under name."""
+        if self.name_filter not in name:
+            return
+
+        # Find a number of calls that takes at least min_time / repeat
+        number = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.min_time / self.repeat or number >= 1 << 20:
+                break
+            number *= 2
+
+        timings: list[float] = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            timings.append((time.perf_counter() - start) / number)
+
+        result = {
+            "name": name,
+            "params": params,
+            "number": number,
+            "repeat": self.repeat,
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.fmean(timings),
+            "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        }
+        self.results.append(result)
+        print(
+            f"{name:<40} {json.dumps(params):<45} "
+            f"{result['median'] * 1e6:>12.1f} us",
+            file=sys.stderr,
+        )
+
+
+def bench_wide(runner: Runner, sizes: list[int]) -> None:
+    """Benchmark configs with many fields on one level."""
+    for fields in sizes:
+        environ = wide_environ(fields)
+        for strict in (True, False):
+            cls = make_wide(fields, strict=strict)
+            params = {"fields": fields, "strict": strict}
+            runner.bench("construct.wide", partial(cls, environ=environ), **params)
+
+        compiled = make_wide(fields, _compiled=True)
+        runner.bench(
+            "construct.wide.compiled",
+            partial(compiled, environ=environ),
+            fields=fields,
+        )
+        lazy = make_wide(fields, _lazy=True)
+        runner.bench(
+            "construct.wide.lazy",
+            partial(lazy, environ=environ),
+            fields=fields,
+        )
+
+        cls = make_wide(fields)
+        config = cls(environ=environ)
+        runner.bench("get_members.wide", config._get_members, fields=fields)
+        runner.bench(
+            "setup.wide",
+            partial(config._setup, _parent_dict={}, _environ=environ),
+            fields=fields,
+        )
+        runner.bench("as_dict.wide", config.as_dict, fields=fields)
+
+
+def bench_deep(runner: Runner, depths: list[int]) -> None:
+    """Benchmark deeply nested SubConfigs."""
+    for depth in depths:
+        for strict in (True, False):
+            cls = make_deep(depth, _strict=strict)
+            runner.bench("construct.deep", cls, depth=depth, strict=strict)
+
+        config = make_deep(depth)()
+        runner.bench("as_dict.deep", config.as_dict, depth=depth)
+
+
+def bench_files(runner: Runner, sizes: list[int], tmpdir: Path) -> None:
+    """Benchmark configs loaded from large JSON and TOML files."""
+    for noise in sizes:
+        document = wide_document(100, noise)
+        files = {"json": tmpdir / f"config_{noise}.json"}
+        files["json"].write_text(json.dumps(document))
+        if toml is not None:
+            files["toml"] = tmpdir / f"config_{noise}.toml"
+            files["toml"].write_text(toml.dumps(document))
+
+        for fmt, path in files.items():
+            for selective in (False, True):
+                cls = make_wide(100, _config_path=path, _selective=selective)
+                params = {"keys": noise, "format": fmt, "selective": selective}
+
+                def _cold(c: type[BaseConfig] = cls) -> None:
+                    file_cache.invalidate()
+                    c()
+
+                runner.bench("construct.file.cold", _cold, **params)
+                runner.bench("construct.file.cached", cls, **params)
+
+
+def bench_environ(runner: Runner, sizes: list[int]) -> None:
+    """Benchmark resolution against large environments."""
+    cls = make_wide(100)
+    for noise in sizes:
+        environ = wide_environ(100, noise)
+        with patched_environ(environ):
+            runner.bench("construct.environ.os", cls, variables=noise)
+            runner.bench(
+                "construct.environ.snapshot",
+                lambda: cls(environ=Environ()),
+                variables=noise,
+            )
+            snapshot = Environ()
+            runner.bench(
+                "construct.environ.shared_snapshot",
+                lambda s=snapshot: cls(environ=s),
+                variables=noise,
+            )
+            runner.bench(
+                "load_from_environment",
+                lambda: load_from_environment(list[int], "BENCH_FIELD_3"),
+                variables=noise,
+            )
+
+
+def main() -> None:
+    """Run the benchmarks and write the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--output", "-o", help="write the JSON results here")
+    parser.add_argument("--filter", "-k", default="", help="only run matching names")
+    parser.add_argument("--quick", action="store_true", help="smaller matrix")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.5)
+    args = parser.parse_args()
+
+    runner = Runner(args.min_time, args.repeat, args.filter)
+    if args.quick:
+        runner.min_time = min(runner.min_time, 0.1)
+        wide, deep, files, environ = [100, 1000], [10], [100], [1000]
+    else:
+        wide, deep, files, environ = [100, 1000, 5000], [10, 50], [100, 5000], [10_000]
+
+    bench_wide(runner, wide)
+    bench_deep(runner, deep)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        bench_files(runner, files, Path(tmpdir))
+    bench_environ(runner, environ)
+
+    report = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "results": runner.results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,5 +2,32 @@
 
 """Config library."""
 
-from .base import BaseConfig, SubConfig  # noqa: F401
-from .file import File, json_file, toml_file  # noqa: F401
+from .base import (  # noqa: F401
+    BaseConfig,
+    SubConfig,
+    aload,
+    check,
+    from_snapshot,
+    load_trace,
+    overlay,
+    reload,
+    snapshot,
+    subscribe,
+)
+from .changes import Change  # noqa: F401
+from .environ import Environ, SecretsDir, read_dotenv  # noqa: F401
+from .export import dump_json, dump_toml, iter_items  # noqa: F401
+from .file import (  # noqa: F401
+    File,
+    Parser,
+    file_cache,
+    json_file,
+    layered_file,
+    register_file_type,
+    toml_file,
+)
+from .frozen import FrozenConfig, freeze  # noqa: F401
+from .holder import ConfigHolder  # noqa: F401
+from .remote import RemoteFile, remote_file  # noqa: F401
+from .trace import LoadTrace  # noqa: F401
+from .watch import ConfigWatcher  # noqa: F401
@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+
+"""Run the voecfg command line interface."""
+
+import sys
+
+from voecfg.cli import main
+
+sys.exit(main())
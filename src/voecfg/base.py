@@ -2,21 +2,116 @@
 
 """Voecfg base class."""
 
+import asyncio
+import contextvars
+import copy
+import functools
 import os
+import pickle  # nosec B403
+import time
+from collections.abc import (
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+)
+from concurrent.futures import Executor
+from contextlib import nullcontext
 from pathlib import Path
 from types import GenericAlias
-from typing import Any, get_origin, get_type_hints
+from typing import Any, TypeVar, get_type_hints
+
+from voecfg.changes import Change, Subscribers, check_path, diff
+from voecfg.environ import Environ, SecretsDir, chain_environ, read_dotenv
+from voecfg.export import REDACTED, is_secret
+from voecfg.file import (
+    File,
+    LayeredFile,
+    file_type_for_path,
+    load_file,
+    preloaded_files,
+)
+from voecfg.schema import FILE, SUB, VALUE, Field, LazyField, Schema
+from voecfg.trace import CountingEnviron, LoadTrace, active_trace, trace_phase
+from voecfg.utils import convert_env_value
+
+_T = TypeVar("_T", bound="BaseConfig")
+_B = TypeVar("_B", bound="_Base")
+
+_SNAPSHOT_FORMAT = ("voecfg-snapshot", 1)
+
+# The members to load, with None for whole members and a nested tree
+# for SubConfigs that are only partly loaded
+Include = dict[str, "Include | None"]
+
+# The errors check() collects while it is running
+_collected_errors: contextvars.ContextVar[list[Exception] | None] = (
+    contextvars.ContextVar("voecfg_collected_errors", default=None)
+)
+
+# Instance attributes that belong to the process, not to the resolved config
+_TRANSIENT = frozenset(
+    (
+        "_environ",
+        "_export_cache",
+        "_lazy_state",
+        "_load_trace",
+        "_members",
+        "_root_environ",
+        "_schema",
+        "_subscribers",
+        "_type_hints",
+    ),
+)
+
+
+class _ConfigMeta(type):
+    """Compile the schemas of config classes again when a member changes.
+
+    Schemas capture the defaults, so assigning a class attribute, e.g.
+    through monkeypatch.setattr(), drops the schemas of the class and
+    its subclasses.
+    """
 
-from voecfg.file import File, json_file, toml_file
-from voecfg.utils import load_from_environment
+    def __setattr__(cls, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            _drop_schemas(cls)
+
+    def __delattr__(cls, name: str) -> None:
+        super().__delattr__(name)
+        if not name.startswith("_"):
+            _drop_schemas(cls)
+
+
+def _drop_schemas(cls: type) -> None:
+    """Forget the schemas of cls and its subclasses, and their LazyFields."""
+    schema: Schema | None = cls.__dict__.get("_voecfg_schema")
+    if schema is not None:
+        type.__delattr__(cls, "_voecfg_schema")
+        for field in schema.fields:
+            lazy = cls.__dict__.get(field.name)
+            if not isinstance(lazy, LazyField):
+                continue
+            if lazy.replaced:
+                type.__setattr__(cls, field.name, lazy.field.default)
+            else:
+                type.__delattr__(cls, field.name)
+    for subclass in cls.__subclasses__():
+        _drop_schemas(subclass)
 
 
-class _Base:
+class _Base(metaclass=_ConfigMeta):
     """Base class for config models."""
 
     _prefix: str = ""
-    _config_path: File | str | Path | None = None
+    _config_path: File | str | Path | Sequence[File | str | Path] | None = None
     _strict: bool = True
+    _compiled: bool = False
+    _lazy: bool = False
+    _secrets: tuple[str, ...] = ()
 
     def __init__(self) -> None:
         self._prefixes: list[str] | None = None
@@ -31,13 +126,72 @@ class _Base:
 
         self._prefix = self._prefix.lower()
 
-        self._members, self._type_hints = self._get_members()
+        self._schema = self._get_schema()
+        self._members = self._schema.members
+        self._type_hints = self._schema.type_hints
+
+    def _get_schema(self) -> Schema:
+        """Return the schema of this class, compiling it on first use."""
+        cls = self.__class__
+        schema: Schema | None = cls.__dict__.get("_voecfg_schema")
+        if schema is None:
+            schema = self._compile_schema()
+            # Resolves lazy fields, and keeps members left out by include
+            # from reading as the class defaults
+            for field in schema.fields:
+                # An inherited LazyField answers for the parent class
+                lazy = LazyField(
+                    field,
+                    has_default=hasattr(cls, field.name),
+                    replaced=field.name in cls.__dict__,
+                )
+                # Not through _ConfigMeta, which would drop the schema
+                type.__setattr__(cls, field.name, lazy)
+            cls._voecfg_schema = schema
+        return schema
+
+    def _compile_schema(self) -> Schema:
+        members, type_hints = self._get_members()
+        annotations = get_type_hints(self)
+        schema = Schema(members, type_hints)
+
+        fields: list[Field] = []
+        for member in members:
+            default = getattr(self, member, None)
+            member_type = type_hints.get(member) if default is None else type(default)
 
-    def _setup(  # noqa: PLR0912, C901
+            # Ignore instantiated classes
+            if getattr(default, "__self__", None):
+                continue
+
+            if isinstance(default, _Base):
+                kind = SUB
+            elif isinstance(default, File):
+                kind = FILE
+            else:
+                kind = VALUE
+
+            fields.append(
+                Field(
+                    member,
+                    kind,
+                    default,
+                    member_type,
+                    type_hints.get(member),
+                    annotations.get(member),
+                ),
+            )
+
+        schema.fields = tuple(fields)
+        return schema
+
+    def _setup(
         self,
         _parent_dict: dict[str, Any] | None = None,
         _prefixes: list[str] | None = None,
         _names: list[str] | None = None,
+        _environ: Mapping[str, str] | None = None,
+        _include: Include | None = None,
     ) -> None:
         self._prefixes = _prefixes or []
 
@@ -48,75 +202,262 @@ class _Base:
         self._names = _names or []
         self._names.append(self._cls_name)
 
-        for member in self._members:
-            member_type: None | type = None
+        prefixes = [*self._prefixes, self._prefix]
+        env_prefix = "_".join(prefixes).upper()
 
-            if (
-                getattr(self, member, None) is None
-            ):  # noqa: SIM114, We want to test these two separately in /tests
-                member_type = self._type_hints.get(member)
-                value = None
-            else:
-                value = getattr(self, member)
-                member_type = type(getattr(self, member))
+        if _environ is None:
+            _environ = os.environ
+        self._root_environ = _environ
+        self._environ = (
+            _environ.scope(env_prefix) if isinstance(_environ, Environ) else _environ
+        )
 
-            # Ignore instantiated classes
-            if getattr(value, "__self__", None):
+        fields = self._included_fields(_include)
+
+        # check() resolves every field, and carries on after errors
+        errors = _collected_errors.get()
+        if errors is not None:
+            for field in fields:
+                self._check_field(field, prefixes, env_prefix, self._names, errors)
+            return
+
+        if self._lazy:
+            # Fields are resolved by their LazyField descriptors
+            self._lazy_state = (prefixes, env_prefix, self._names)
+            return
+
+        trace = active_trace()
+        if self._compiled and _include is None:
+            loader = self._schema.get_loader(
+                env_prefix,
+                self._strict,
+                traced=trace is not None,
+            )
+            loader(self, self._current_dict, prefixes, self._names, _environ)
+            return
+
+        if trace is not None:
+            self._setup_traced(trace, prefixes, env_prefix)
+            return
+
+        for field in fields:
+            self._setup_field(field, prefixes, env_prefix, self._names)
+
+    def _included_fields(self, include: Include | None) -> tuple[Field, ...]:
+        """Return the fields to load, remembering include on the instance."""
+        if include is None:
+            return self._schema.fields
+
+        # The members left out are never looked at
+        self._include = include
+        return tuple(field for field in self._schema.fields if field.name in include)
+
+    def _is_excluded(self, member: str) -> bool:
+        """Return True if member was left out of the load by include."""
+        include = self.__dict__.get("_include")
+        return include is not None and member not in include
+
+    def _not_loaded(self, member: str) -> AttributeError:
+        var_path = ".".join([*(self._names or []), member])
+        return AttributeError(f"{var_path} was not loaded, it is not in include")
+
+    def _setup_traced(
+        self,
+        trace: LoadTrace,
+        prefixes: list[str],
+        env_prefix: str,
+    ) -> None:
+        """Like the loop in _setup(), but time every field."""
+        names = self._names or []
+        environ = self._environ
+        self._environ = CountingEnviron(environ, trace)
+        try:
+            for field in trace.fields(self._schema):
+                if self._is_excluded(field.name):
+                    continue
+                start = time.perf_counter()
+                self._setup_field(field, prefixes, env_prefix, names)
+                elapsed = time.perf_counter() - start
+
+                if field.kind == SUB:
+                    trace.subconfigs[".".join([*names, field.name])] = elapsed
+                elif field.kind == FILE:
+                    trace.add("file_members", elapsed)
+                else:
+                    trace.add("values", elapsed)
+        finally:
+            self._environ = environ
+
+    def _check_field(
+        self,
+        field: Field,
+        prefixes: list[str],
+        env_prefix: str,
+        names: list[str],
+        errors: list[Exception],
+    ) -> None:
+        """Set up a field for check(), collecting its error instead of raising."""
+        try:
+            self._setup_field(field, prefixes, env_prefix, names)
+        except (ValueError, TypeError) as e:
+            errors.append(e)
+
+    def _setup_field(
+        self,
+        field: Field,
+        prefixes: list[str],
+        env_prefix: str,
+        names: list[str],
+    ) -> None:
+        member = field.name
+        # Format the environment variable name
+        env_key = env_prefix + field.env_suffix
+
+        value: Any
+        if field.kind == SUB:
+            # Every instance gets its own copy of the nested config,
+            # so configs built side by side don't share state.
+            value = copy.copy(field.default)
+            include = self.__dict__.get("_include")
+            value._setup(  # noqa: SLF001
+                _prefixes=[*prefixes],
+                _parent_dict=self._current_dict,
+                _names=[*names],
+                _environ=self._root_environ,
+                _include=None if include is None else include[member],
+            )
+            setattr(self, member, value)
+            return
+
+        if field.kind == FILE:
+            value = load_file(field.default)
+        else:
+            value = field.default
+
+            # Try to get the value from the config file
+            dict_value = self._current_dict.get(member)
+            if dict_value:
+                value = dict_value
+
+            if env_key in self._environ:
+                value = convert_env_value(
+                    field.converter,
+                    env_key,
+                    self._environ[env_key],
+                )
+
+        var_path = ".".join([*names, member])
+        # Do a final check to see if the value is set
+        if value is None:
+            msg = f"Value for {var_path} / {env_key} not set."
+            raise ValueError(msg)
+
+        if self._strict and field.checker is not None:
+            # Casts values files can't represent, e.g. str to Path
+            try:
+                value = field.checker(value)
+            except TypeError:
+                msg = (
+                    f"{var_path} / {env_key} is {type(value)}, "
+                    f"expected {field.expected_origin}"
+                )
+                raise TypeError(msg) from None
+
+        setattr(self, member, value)
+
+    def _reloaded(self, parent_dict: Any) -> "_Base | None":
+        """Return a copy of this node with changed inputs resolved again.
+
+        Returns None if nothing in this subtree changed.
+        """
+        current = parent_dict.get(self._prefix, {}) if parent_dict else {}
+        input_changed = current != self._current_dict
+
+        scratch = copy.copy(self)
+        scratch._current_dict = current  # noqa: SLF001
+        names = self._names or []
+        prefixes = [*(self._prefixes or []), self._prefix]
+        env_prefix = "_".join(prefixes).upper()
+
+        changed = input_changed
+        for field in self._schema.fields:
+            member = field.name
+            # Lazy fields that were never read pick up the new input on access
+            if member not in self.__dict__:
+                continue
+
+            if field.kind == SUB:
+                sub = self.__dict__[member]._reloaded(current)  # noqa: SLF001
+                if sub is not None:
+                    setattr(scratch, member, sub)
+                    changed = True
                 continue
 
-            # Format the environment variable name
-            env_key = "_".join([*self._prefixes, self._prefix, member]).upper()
+            if field.kind == FILE or input_changed:
+                scratch._setup_field(field, prefixes, env_prefix, names)  # noqa: SLF001
+                if scratch.__dict__[member] != self.__dict__[member]:
+                    changed = True
 
-            # Check if the value is a subclass of BaseConfig
-            if isinstance(value, _Base):
-                new_prefixes = [*self._prefixes, self._prefix]
-                new_names = [*self._names]
+        return scratch if changed else None
 
-                value._setup(  # noqa: SLF001
-                    _prefixes=new_prefixes,
-                    _parent_dict=self._current_dict,
-                    _names=new_names,
+    def _watched_files(self) -> list[File]:
+        """Return the files this config tree is loaded from."""
+        return self._files_in(self.__dict__.get("_include"))
+
+    def _files_in(self, include: Include | None) -> list[File]:
+        """Return the files of the members in include, or of all members."""
+        files: list[File] = []
+        for field in self._schema.fields:
+            if include is not None and field.name not in include:
+                continue
+            if field.kind == FILE:
+                files.append(field.default)
+            elif field.kind == SUB:
+                files.extend(
+                    field.default._files_in(  # noqa: SLF001
+                        None if include is None else include[field.name],
+                    ),
                 )
-            elif isinstance(value, File):
-                setattr(self, member, value.load())
-            else:
-                # Try to get the value from the config file
-                dict_value = self._current_dict.get(member)
-                if dict_value:
-                    setattr(self, member, dict_value)
-
-                if env_key in os.environ:
-                    env_value = load_from_environment(member_type, env_key)
-                    setattr(self, member, env_value)
-
-            var_path = ".".join([*self._names, member])
-            # Do a final check to see if the value is set
-            if getattr(self, member, None) is None:  # noqa: PLR6201
-                msg = f"Value for {var_path} / {env_key} not set."
-                raise ValueError(msg)
+        return files
 
-            if self._strict and not isinstance(getattr(self, member), _Base):
-                value = getattr(self, member)
-                actual: type = type(value)
-                expected = self._type_hints.get(member)
-                expected_origin = get_origin(expected) or expected
-
-                # Special case: cast str to Path if expected is Path
-                if expected_origin is Path and isinstance(value, str):
-                    casted_value = Path(value)
-                    setattr(self, member, casted_value)
-                    value = casted_value
-                    actual = Path
-
-                if expected_origin is not None and not isinstance(
-                    value,
-                    expected_origin,
-                ):
-                    msg = (
-                        f"{var_path} / {env_key} is {actual}, "
-                        f"expected {expected_origin}"
-                    )
-                    raise TypeError(msg)
+    def _snapshot_state(self) -> dict[str, Any]:
+        """Return the resolved values and bookkeeping of this subtree."""
+        state: dict[str, Any] = {}
+        for field in self._schema.fields:
+            if self._is_excluded(field.name):
+                continue
+            # Resolves lazy fields that were never read
+            value = getattr(self, field.name)
+            if field.kind == SUB:
+                value = value._snapshot_state()  # noqa: SLF001
+            state[field.name] = value
+
+        for key, value in self.__dict__.items():
+            if key not in state and key not in _TRANSIENT:
+                state[key] = value
+        return state
+
+    @classmethod
+    def _from_state(cls, state: dict[str, Any]) -> Any:
+        """Rebuild a node from _snapshot_state(), without resolving anything."""
+        # Compile the schema first, from an instance without the state,
+        # so the state's values aren't taken for the class defaults
+        schema = cls.__new__(cls)._get_schema()  # noqa: SLF001
+
+        self = cls.__new__(cls)
+        self.__dict__.update(state)
+        self._schema = schema
+        self._members = schema.members
+        self._type_hints = schema.type_hints
+        self._root_environ = self._environ = os.environ
+
+        for field in schema.fields:
+            if field.kind == SUB and field.name in state:
+                sub = type(field.default)._from_state(  # noqa: SLF001
+                    state[field.name],
+                )
+                setattr(self, field.name, sub)
+        return self
 
     def _get_members(self) -> tuple[dict[str, Any], dict[str, Any]]:
         """Get all members of the class, including members with only type hints."""
@@ -135,6 +476,10 @@ class _Base:
             if member.startswith("_"):
                 continue
 
+            # Ignore fields without a default, see LazyField
+            if not hasattr(self, member):
+                continue
+
             members[member] = getattr(self, member)
             type_hints[member] = type(getattr(self, member))
 
@@ -154,6 +499,52 @@ class _Base:
 
         return members, type_hints
 
+    def _overlay(self: _B, overrides: Mapping[str, Any]) -> _B:  # noqa: PYI019
+        """Return a copy with overrides applied, see overlay()."""
+        derived = copy.copy(self)
+        # The exports and subscribers of this config don't apply to the copy
+        derived.__dict__.pop("_export_cache", None)
+        derived.__dict__.pop("_subscribers", None)
+
+        fields = {field.name: field for field in self._schema.fields}
+        names = self._names or []
+        env_prefix = "_".join([*(self._prefixes or []), self._prefix]).upper()
+        for member, value in overrides.items():
+            field = fields.get(member)
+            if field is None:
+                msg = f"{'.'.join(names)} has no member {member}"
+                raise KeyError(msg)
+            if self._is_excluded(member):
+                raise self._not_loaded(member)
+
+            if field.kind == SUB:
+                if not isinstance(value, Mapping):
+                    msg = f"Overrides for {'.'.join([*names, member])} must be a dict"
+                    raise TypeError(msg)
+                overlaid = overlay(getattr(self, member), value)
+                setattr(derived, member, overlaid)
+                continue
+
+            env_key = env_prefix + field.env_suffix
+            var_path = ".".join([*names, member])
+            if value is None:
+                msg = f"Value for {var_path} / {env_key} not set."
+                raise ValueError(msg)
+
+            if self._strict and field.checker is not None:
+                try:
+                    value = field.checker(value)
+                except TypeError:
+                    msg = (
+                        f"{var_path} / {env_key} is {type(value)}, "
+                        f"expected {field.expected_origin}"
+                    )
+                    raise TypeError(msg) from None
+
+            setattr(derived, member, value)
+
+        return derived
+
     def as_dict(self) -> dict[str, Any]:
         """Export the config as a dict.
 
@@ -168,6 +559,8 @@ class _Base:
         data: dict[str, Any] = {}
 
         for member in self._members:
+            if self._is_excluded(member):
+                continue
             value = getattr(self, member)
 
             if isinstance(value, _Base):
@@ -182,6 +575,32 @@ class _Base:
 
         return data
 
+    def _export_root(self) -> tuple[str, ...]:
+        """Return the keys this node is nested under in as_dict()."""
+        return ()
+
+    def _export_items(
+        self,
+        *,
+        redact: bool,
+        sort_keys: bool,
+    ) -> Iterator[tuple[str, Any, bool]]:
+        """Yield what as_dict() exports as (key, value, is a SubConfig)."""
+        members = sorted(self._members) if sort_keys else self._members
+        for member in members:
+            if self._is_excluded(member):
+                continue
+            value = getattr(self, member)
+
+            if isinstance(value, _Base):
+                yield value._prefix, value, True  # noqa: SLF001
+            elif callable(value):
+                continue
+            elif redact and is_secret(self, member):
+                yield member, REDACTED, False
+            else:
+                yield member, value, False
+
 
 class SubConfig(_Base):
     """A class to hold configuration values for nested config classes.
@@ -190,6 +609,9 @@ class SubConfig(_Base):
 
     Class variables:
         _prefix: str, the prefix to use for environment variables
+        _compiled: bool, generate and cache a specialized loader for the class
+        _lazy: bool, resolve each field on first access instead of up front
+        _secrets: tuple[str, ...], members to redact when exporting
     """
 
 
@@ -200,47 +622,373 @@ class BaseConfig(_Base):
 
     Class variables:
         _prefix: str, the prefix to use for environment variables
-        _config_path: None | str | Path | File, the path to the config file
+        _config_path: None | str | Path | File, the path to the config file,
+            or a list of them, deep-merged in order with later files winning
         _strict: bool, raise if the type of a value does not match the type hint
+        _compiled: bool, generate and cache a specialized loader for the class
+        _selective: bool, only parse the _prefix part of a TOML config file,
+            and only copy the _prefix part of other files
+        _lazy: bool, resolve each field on first access instead of up front
+        _secrets: tuple[str, ...], members to redact when exporting
+        _env_file: None | str | Path, a .env file with variables to use when
+            they are not set in the environment, which is left untouched;
+            a missing file is ignored
+        _secrets_dir: None | str | Path | SecretsDir, a directory of files
+            named like environment variables, used when a variable isn't set
+        _trace: bool | Callable[[LoadTrace], None], record a LoadTrace of
+            each load, available from load_trace(), and pass it to the
+            callable if one is given
     """
 
-    def __init__(self) -> None:
-        super().__init__()
+    _selective: bool = False
+    _env_file: str | Path | None = None
+    _secrets_dir: str | Path | SecretsDir | None = None
+    _trace: bool | Callable[[LoadTrace], None] = False
 
-        parent_dict: Any = {}
+    def __init__(
+        self,
+        *,
+        environ: Mapping[str, str] | None = None,
+        include: Iterable[str] | None = None,
+    ) -> None:
+        """Load the config.
+
+        environ: None | Mapping[str, str], the environment variables to read,
+            e.g. a shared Environ snapshot. Defaults to os.environ.
+        include: None | Iterable[str], load only these members, e.g.
+            ["queue", "db.host"]. The other members are not read from the
+            environment, their File members are not loaded, and they are
+            not checked. Reading them raises AttributeError. Defaults to
+            loading everything.
+        """
+        self._load(environ, include=include)
 
+    def _load(
+        self,
+        environ: Mapping[str, str] | None,
+        parent_dict: Any = None,
+        include: Iterable[str] | None = None,
+    ) -> None:
+        """Load the config, from parent_dict if the config file was read already."""
+        trace = LoadTrace(self.__class__.__name__) if self._trace else None
+        with trace.activate() if trace is not None else nullcontext():
+            with trace_phase(trace, "schema"):
+                super().__init__()
+                tree = None if include is None else self._include_tree(include)
+
+            with trace_phase(trace, "config_file"):
+                if parent_dict is None:
+                    parent_dict = self._load_parent_dict()
+
+            # The environment wins over the .env file, which wins over secrets
+            sources: list[Mapping[str, str]] = []
+            if self._env_file is not None:
+                sources.append(read_dotenv(self._env_file, self._prefix.upper()))
+            secrets_dir = self._get_secrets_dir()
+            if secrets_dir is not None:
+                sources.append(secrets_dir)
+            if sources:
+                environ = chain_environ(
+                    os.environ if environ is None else environ,
+                    *sources,
+                )
+
+            with trace_phase(trace, "setup"):
+                self._setup(
+                    # TODO: Find out why pyright is complaining about this
+                    _parent_dict=parent_dict,  # pyright: ignore [reportArgumentType]
+                    _environ=environ,
+                    _include=tree,
+                )
+
+        if trace is not None:
+            self._load_trace = trace
+            # Looked up on the class, so a plain function isn't bound
+            callback = type(self)._trace  # noqa: SLF001
+            if callable(callback):
+                callback(trace)
+
+    def _include_tree(self, include: Iterable[str]) -> Include:
+        """Return the member paths in include as a tree, checking each path."""
+        if isinstance(include, str):
+            msg = f"{self._cls_name}: include must be a list of paths, not a str"
+            raise TypeError(msg)
+
+        tree: Include = {}
+        for path in include:
+            if not path:
+                msg = f"{self._cls_name}: Empty path in include"
+                raise ValueError(msg)
+            check_path(self, path)
+
+            node = tree
+            *parents, member = path.split(".")
+            for parent in parents:
+                if parent in node and node[parent] is None:
+                    # The whole SubConfig is included already
+                    break
+                node = node.setdefault(parent, {})  # type: ignore[assignment]
+            else:
+                node[member] = None
+        return tree
+
+    def _config_file(self) -> File | None:
+        """Return _config_path as a File, or None if it is not set."""
         config_path = self._config_path
+        if not isinstance(config_path, (list, tuple)):
+            return self._as_config_file(config_path)
+
+        # Keep the LayeredFile, so its merge is reused between loads
+        cls = self.__class__
+        cached = cls.__dict__.get("_voecfg_layers")
+        if cached is not None and cached[0] is config_path:
+            return cached[1]
+
+        layers: list[File] = []
+        for path in config_path:
+            layer = self._as_config_file(path)
+            if layer is None:
+                msg = f"{self._cls_name}: Empty _config_path layer"
+                raise ValueError(msg)
+            layers.append(layer)
+
+        layered = LayeredFile(layers)
+        cls._voecfg_layers = (config_path, layered)
+        return layered
+
+    def _get_secrets_dir(self) -> SecretsDir | None:
+        """Return _secrets_dir as a SecretsDir, or None if it is not set."""
+        secrets_dir = self._secrets_dir
+        if secrets_dir is None or isinstance(secrets_dir, SecretsDir):
+            return secrets_dir
+
+        # Keep the SecretsDir, so its index and values are reused between loads
+        cls = self.__class__
+        cached = cls.__dict__.get("_voecfg_secrets_dir")
+        if cached is None or cached.path != Path(secrets_dir):
+            cached = SecretsDir(secrets_dir)
+            cls._voecfg_secrets_dir = cached
+        return cached
+
+    def _as_config_file(self, config_path: Any) -> File | None:
         if isinstance(config_path, Path):
             config_path = str(config_path.resolve().absolute())
 
-        if config_path:
-            # If the path is a File object, load it
-            if isinstance(config_path, File):
-                parent_dict = config_path.load()
-                if not isinstance(parent_dict, (dict, list)):
-                    msg = f"{self._cls_name}: {config_path} did not return a dict"
-                    raise TypeError(msg)
+        if not config_path:
+            return None
 
-            # If the path is a string, try to load it as a JSON or TOML file
-            elif isinstance(
-                config_path,
-                str,
-            ):  # pyright: ignore[reportUnnecessaryIsInstance]
-                if config_path.endswith(".json"):
-                    parent_dict = json_file(config_path).load()
-                elif config_path.endswith(".toml"):
-                    parent_dict = toml_file(config_path).load()
-                else:
-                    msg = f"{self._cls_name}: Unknown file type: {config_path}"
-                    raise ValueError(msg)
-
-            else:
-                _clsn = self._cls_name
-                _tcp = type(config_path)
-                msg = f"{_clsn}: Unsupported _config_path type: {_tcp}"
+        # If the path is a string, use the File type for its suffix
+        if isinstance(config_path, str):
+            file_cls = file_type_for_path(config_path)
+            if file_cls is None:
+                msg = f"{self._cls_name}: Unknown file type: {config_path}"
                 raise ValueError(msg)
-
-        self._setup(
-            # TODO: Find out why pyright is complaining about this
-            _parent_dict=parent_dict,  # pyright: ignore [reportArgumentType]
+            return file_cls(config_path)
+
+        if isinstance(
+            config_path,
+            File,
+        ):  # pyright: ignore[reportUnnecessaryIsInstance]
+            return config_path
+
+        _clsn = self._cls_name
+        _tcp = type(config_path)
+        msg = f"{_clsn}: Unsupported _config_path type: {_tcp}"
+        raise ValueError(msg)
+
+    def _load_parent_dict(self) -> Any:
+        config_file = self._config_file()
+        if config_file is None:
+            return {}
+
+        if self._selective:
+            parent_dict = config_file.load_keys((self._prefix,))
+        else:
+            parent_dict = config_file.load()
+        if not isinstance(parent_dict, (dict, list)):
+            msg = f"{self._cls_name}: {config_file} did not return a dict"
+            raise TypeError(msg)
+        return parent_dict
+
+    def _export_root(self) -> tuple[str, ...]:
+        return (self._prefix,)
+
+    def _watched_files(self) -> list[File]:
+        files = super()._watched_files()
+        config_file = self._config_file()
+        if config_file is not None:
+            files.insert(0, config_file)
+        return files
+
+
+def check(
+    config_cls: type[BaseConfig],
+    *,
+    environ: Mapping[str, str] | None = None,
+    include: Iterable[str] | None = None,
+) -> list[Exception]:
+    """Load a config class and return every error, instead of raising the first.
+
+    Collects the ValueErrors and TypeErrors of all fields in the tree,
+    or in the members in include, including lazy ones. Errors loading
+    the config file end the check, and are returned as well. An empty
+    list means the config is valid.
+    """
+    errors: list[Exception] = []
+    token = _collected_errors.set(errors)
+    try:
+        config_cls(environ=environ, include=include)
+    except (OSError, ValueError, TypeError) as e:
+        errors.append(e)
+    finally:
+        _collected_errors.reset(token)
+    return errors
+
+
+async def aload(
+    config_cls: type[_T],
+    *,
+    environ: Mapping[str, str] | None = None,
+    include: Iterable[str] | None = None,
+    executor: Executor | None = None,
+) -> _T:
+    """Load a config of config_cls without blocking the event loop.
+
+    The config file and every File member in the tree, or in the
+    members in include, are read concurrently in executor, the loop's
+    default executor if None, and the config is then resolved there
+    as well.
+    """
+    loop = asyncio.get_running_loop()
+
+    def _run(func: Callable[[], Any]) -> Awaitable[Any]:
+        return loop.run_in_executor(executor, contextvars.copy_context().run, func)
+
+    # Compiles the schema, if needed, to find the File members
+    probe = config_cls.__new__(config_cls)
+    await _run(functools.partial(_Base.__init__, probe))
+    tree = None if include is None else probe._include_tree(include)  # noqa: SLF001
+    files = probe._files_in(tree)  # noqa: SLF001
+
+    parent_dict, *values = await asyncio.gather(
+        _run(probe._load_parent_dict),  # noqa: SLF001
+        *(_run(file.load) for file in files),
+    )
+
+    def _build() -> _T:
+        config = config_cls.__new__(config_cls)
+        token = preloaded_files.set(
+            {id(file): value for file, value in zip(files, values, strict=True)},
         )
+        try:
+            config._load(environ, parent_dict, include)  # noqa: SLF001
+        finally:
+            preloaded_files.reset(token)
+        return config
+
+    return await _run(_build)
+
+
+def reload(config: BaseConfig) -> bool:
+    """Re-read the files of a config and update the values that changed.
+
+    Only subtrees whose part of the config file changed, and File
+    members whose contents changed, are resolved again. The new values
+    are built on copies and swapped in with a single update, so
+    SubConfigs a reader already holds keep their old values.
+
+    Returns True if anything changed.
+    """
+    reloaded = config._reloaded(config._load_parent_dict())  # noqa: SLF001
+    if reloaded is None:
+        return False
+
+    subscribers: Subscribers | None = config.__dict__.get("_subscribers")
+    changes = diff(config, reloaded) if subscribers else []
+    config.__dict__.update(reloaded.__dict__)
+    if subscribers:
+        subscribers.notify(changes)
+    return True
+
+
+def load_trace(config: BaseConfig) -> LoadTrace | None:
+    """Return the LoadTrace of the last load of config, if _trace is enabled."""
+    return config.__dict__.get("_load_trace")
+
+
+def snapshot(config: BaseConfig) -> bytes:
+    """Serialize the resolved config tree, to restore it in another process.
+
+    Lazy fields are resolved first. The snapshot is a pickle, so every
+    value in the config must be picklable, and a snapshot must only be
+    restored from a trusted source, e.g. a master process handing it to
+    its workers. Restore it with from_snapshot().
+    """
+    cls = config.__class__
+    return pickle.dumps(
+        (
+            *_SNAPSHOT_FORMAT,
+            f"{cls.__module__}.{cls.__qualname__}",
+            config._snapshot_state(),  # noqa: SLF001
+        ),
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+
+
+def from_snapshot(config_cls: type[_T], blob: bytes) -> _T:
+    """Restore a config of config_cls from snapshot().
+
+    Nothing is loaded or converted again: no config files or File
+    members are read, and the environment is not consulted. Only the
+    class schema is compiled, if this process hasn't done so already.
+    reload() reads the files and environment of this process.
+
+    Only restore snapshots from a trusted source, see snapshot().
+    """
+    try:
+        kind, version, name, state = pickle.loads(blob)  # noqa: S301  # nosec B301
+    except (pickle.UnpicklingError, TypeError, ValueError, EOFError) as e:
+        msg = f"{config_cls.__name__}: Not a config snapshot: {e}"
+        raise ValueError(msg) from e
+
+    if (kind, version) != _SNAPSHOT_FORMAT:
+        msg = f"{config_cls.__name__}: Unsupported snapshot format: {kind} {version}"
+        raise ValueError(msg)
+
+    expected = f"{config_cls.__module__}.{config_cls.__qualname__}"
+    if name != expected:
+        msg = f"{config_cls.__name__}: Snapshot is of {name}, not {expected}"
+        raise ValueError(msg)
+
+    return config_cls._from_state(state)  # noqa: SLF001
+
+
+def overlay(config: _B, overrides: Mapping[str, Any]) -> _B:
+    """Return a copy of config with some values replaced.
+
+    overrides maps member names to values, or to dicts of overrides
+    for SubConfigs, e.g. {"db": {"pool_size": 50}}. Only the overridden
+    values are checked, like values from a config file. Everything
+    else, including SubConfigs without overrides, is shared with config,
+    so config must not be changed in place afterwards.
+    """
+    return config._overlay(overrides)  # noqa: SLF001
+
+
+def subscribe(
+    config: BaseConfig,
+    path: str,
+    callback: Callable[[list[Change]], None],
+) -> Callable[[], None]:
+    """Call callback with the changes at or below path after reload(config).
+
+    path is an attribute path, e.g. "db.pool_size" for one value,
+    "db" for a SubConfig, or "" for everything. The changes are only
+    looked for in the subtrees reload() resolved again. Returns a
+    function that unsubscribes the callback.
+    """
+    check_path(config, path)
+    subscribers = config.__dict__.get("_subscribers")
+    if subscribers is None:
+        subscribers = config.__dict__["_subscribers"] = Subscribers()
+    return subscribers.subscribe(path, callback)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+"""Tell subscribers which config values changed."""
+
+import threading
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from voecfg.schema import SUB
+
+if TYPE_CHECKING:  # pragma: no cover
+    from voecfg.base import _Base
+
+
+class Change(NamedTuple):
+    """A value that changed between two versions of a config.
+
+    path: str, the attribute path of the value, e.g. "db.pool_size"
+    old: Any, the old value
+    new: Any, the new value
+    """
+
+    path: str
+    old: Any
+    new: Any
+
+
+Callback = Callable[[list[Change]], None]
+
+
+def diff(old: "_Base", new: "_Base", path: str = "") -> list[Change]:
+    """Return the values that differ between two versions of a config.
+
+    SubConfigs that are the same object in both, e.g. the subtrees
+    reload() didn't touch, are skipped without looking inside. Lazy
+    fields that were never resolved in either version are skipped too.
+    """
+    if old is new:
+        return []
+
+    changes: list[Change] = []
+    for field in old._schema.fields:  # noqa: SLF001
+        member = field.name
+        if member not in old.__dict__ or member not in new.__dict__:
+            continue
+
+        old_value = old.__dict__[member]
+        new_value = new.__dict__[member]
+        member_path = f"{path}.{member}" if path else member
+        if field.kind == SUB:
+            changes.extend(diff(old_value, new_value, member_path))
+        elif old_value is not new_value and old_value != new_value:
+            changes.append(Change(member_path, old_value, new_value))
+    return changes
+
+
+def check_path(config: "_Base", path: str) -> None:
+    """Raise KeyError if path is not a member or SubConfig of config."""
+    node = config
+    members = path.split(".") if path else []
+    for index, member in enumerate(members):
+        field = next(
+            (f for f in node._schema.fields if f.name == member),  # noqa: SLF001
+            None,
+        )
+        last = index == len(members) - 1
+        if field is None or (field.kind != SUB and not last):
+            msg = f"{type(config).__name__} has no member {path}"
+            raise KeyError(msg)
+        node = field.default
+
+
+class Subscribers:
+    """Callbacks subscribed to paths in a config."""
+
+    def __init__(self) -> None:
+        self._callbacks: list[tuple[str, Callback]] = []
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self._callbacks)
+
+    def subscribe(self, path: str, callback: Callback) -> Callable[[], None]:
+        """Call callback with the changes at or below path.
+
+        Returns a function that unsubscribes the callback.
+        """
+        entry = (path, callback)
+        with self._lock:
+            self._callbacks = [*self._callbacks, entry]
+
+        def _unsubscribe() -> None:
+            with self._lock:
+                self._callbacks = [e for e in self._callbacks if e is not entry]
+
+        return _unsubscribe
+
+    def notify(self, changes: list[Change]) -> None:
+        """Call every callback that has changes at or below its path."""
+        if not changes:
+            return
+        for path, callback in self._callbacks:
+            if not path:
+                callback(changes)
+                continue
+            prefix = f"{path}."
+            matching = [
+                change
+                for change in changes
+                if change.path == path or change.path.startswith(prefix)
+            ]
+            if matching:
+                callback(matching)
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+
+"""Command line interface, run with python -m voecfg."""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import voecfg.base
+from voecfg.base import BaseConfig
+from voecfg.environ import Environ, read_dotenv
+
+
+def import_config(path: str) -> type[BaseConfig]:
+    """Import a config class from "package.module:Class" or "package.module.Class"."""
+    module_name, sep, attr = path.partition(":")
+    if not sep:
+        module_name, _, attr = path.rpartition(".")
+    if not module_name or not attr:
+        msg = f"Not an import path: {path}"
+        raise ValueError(msg)
+
+    obj: Any = importlib.import_module(module_name)
+    for name in attr.split("."):
+        obj = getattr(obj, name)
+
+    if not isinstance(obj, type) or not issubclass(obj, BaseConfig):
+        msg = f"{path} is not a BaseConfig subclass"
+        raise TypeError(msg)
+    return obj
+
+
+def find_env_files(paths: Iterable[str]) -> list[Path]:
+    """Return the env files given, and the .env files in the directories given."""
+    files: list[Path] = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(
+                sorted(
+                    p
+                    for p in path.iterdir()
+                    if p.is_file() and (p.name.startswith(".env") or p.suffix == ".env")
+                ),
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def _error(error: BaseException) -> dict[str, str]:
+    return {"type": type(error).__name__, "message": str(error)}
+
+
+def check_config(
+    config_path: str,
+    env_files: Sequence[str],
+    *,
+    inherit_env: bool = False,
+) -> list[dict[str, Any]]:
+    """Check one config class against each of the env files given.
+
+    Runs in a worker process. The files the config reads are parsed once
+    per worker, through file_cache, and shared between the env files.
+    """
+    try:
+        config_cls = import_config(config_path)
+    except Exception as e:  # noqa: BLE001
+        return [
+            {"config": config_path, "env": env, "ok": False, "errors": [_error(e)]}
+            for env in env_files
+        ]
+
+    base = dict(os.environ) if inherit_env else {}
+    results: list[dict[str, Any]] = []
+    for env in env_files:
+        try:
+            # read_dotenv() ignores missing files, an env file to check isn't
+            Path(env).stat()
+            environ = Environ({**base, **read_dotenv(env)})
+        except (OSError, UnicodeDecodeError) as e:
+            errors: list[BaseException] = [e]
+        else:
+            errors = list(voecfg.base.check(config_cls, environ=environ))
+        results.append(
+            {
+                "config": config_path,
+                "env": env,
+                "ok": not errors,
+                "errors": [_error(e) for e in errors],
+            },
+        )
+    return results
+
+
+def _split(
+    configs: Sequence[str],
+    env_files: Sequence[str],
+    workers: int,
+) -> list[tuple[str, Sequence[str]]]:
+    """Split the config x env file matrix into about one task per worker.
+
+    Each config is a task of its own, and when there are fewer configs than
+    workers its env files are split into consecutive chunks, so the results
+    keep their order.
+    """
+    chunks = max(1, min(len(env_files), -(-workers // max(len(configs), 1))))
+    size = max(1, -(-len(env_files) // chunks))
+    return [
+        (config, env_files[start : start + size])
+        for config in configs
+        for start in range(0, len(env_files), size)
+    ]
+
+
+def check(
+    configs: Sequence[str],
+    env_files: Sequence[str],
+    *,
+    jobs: int | None = None,
+    inherit_env: bool = False,
+) -> dict[str, Any]:
+    """Check every config class against every env file, in parallel.
+
+    Returns a report with one result per combination. The combinations are
+    spread over the worker processes, by config and then by env file. With
+    jobs=1, or a single combination, everything runs in this process.
+    """
+    workers = jobs or os.cpu_count() or 1
+    tasks = _split(configs, env_files, workers)
+    if workers == 1 or len(tasks) <= 1:
+        batches = [
+            check_config(config, envs, inherit_env=inherit_env)
+            for config, envs in tasks
+        ]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            futures = [
+                executor.submit(
+                    check_config,
+                    config,
+                    envs,
+                    inherit_env=inherit_env,
+                )
+                for config, envs in tasks
+            ]
+            batches = [future.result() for future in futures]
+
+    results = [result for batch in batches for result in batch]
+    return {
+        "checked": len(results),
+        "failed": sum(not result["ok"] for result in results),
+        "results": results,
+    }
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m voecfg")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    check_parser = commands.add_parser(
+        "check",
+        help="load config classes against env files and report every error",
+    )
+    check_parser.add_argument(
+        "configs",
+        nargs="+",
+        metavar="CONFIG",
+        help="import path of a BaseConfig subclass, e.g. app.config:AppConfig",
+    )
+    check_parser.add_argument(
+        "-e",
+        "--env",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="an env file, or a directory of .env files; can be repeated",
+    )
+    check_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of worker processes, defaults to the number of CPUs",
+    )
+    check_parser.add_argument(
+        "--inherit-env",
+        action="store_true",
+        help="start from the current environment instead of an empty one",
+    )
+    check_parser.add_argument(
+        "--indent",
+        type=int,
+        default=None,
+        help="indent the JSON report",
+    )
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the command line interface, and return the exit code."""
+    args = _parser().parse_args(argv)
+
+    env_files = [str(path) for path in find_env_files(args.env)]
+    if not env_files:
+        # Check against the environment alone
+        env_files = [os.devnull]
+        args.inherit_env = True
+
+    report = check(
+        args.configs,
+        env_files,
+        jobs=args.jobs,
+        inherit_env=args.inherit_env,
+    )
+    json.dump(report, sys.stdout, indent=args.indent)
+    sys.stdout.write("\n")
+    return 1 if report["failed"] else 0
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+
+"""Environment snapshots and other sources of environment variables."""
+
+import os
+import re
+import threading
+import time
+from collections import ChainMap
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+from typing import NamedTuple
+
+
+class Environ(Mapping[str, str]):
+    """A read-only snapshot of environment variables, indexed by prefix.
+
+    Taking a snapshot copies os.environ once, so every lookup during a
+    load sees the same values, and no lookup has to go through the
+    encoding os.environ does on every access. A snapshot can be passed
+    to several configs, e.g. AppConfig(environ=snapshot), to share the
+    scan between them.
+    """
+
+    __slots__ = ("_data", "_scopes")
+
+    def __init__(self, environ: Mapping[str, str] | None = None) -> None:
+        self._data = dict(os.environ if environ is None else environ)
+        self._scopes: dict[str, dict[str, str]] = {}
+
+    def __getitem__(self, key: str) -> str:
+        return self._data[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self._data)} variables)"
+
+    def scope(self, prefix: str) -> Mapping[str, str]:
+        """Return the variables whose names start with prefix and an underscore.
+
+        Scopes are cached, and each one is filtered from the scope of its
+        parent prefix, so a config tree scans the whole environment once.
+        """
+        scope = self._scopes.get(prefix)
+        if scope is None:
+            parent = prefix.rpartition("_")[0]
+            source = self.scope(parent) if parent else self._data
+            start = f"{prefix}_"
+            scope = {k: v for k, v in source.items() if k.startswith(start)}
+            self._scopes[prefix] = scope
+        return scope
+
+
+class SecretsDir(Mapping[str, str]):
+    """Environment variables read from files in a directory.
+
+    Maps each variable to the file with the same name, ignoring case,
+    e.g. APP_DB_PASSWORD to /run/secrets/app_db_password, the way Docker
+    and Kubernetes mount secrets. The directory is listed once to build
+    the index, and a file is only read when its variable is looked up.
+    Trailing newlines are stripped.
+
+    Values are cached for ttl seconds, or forever if ttl is None, so
+    rotated secrets are picked up by later loads. The index is rebuilt
+    at the same interval.
+    """
+
+    def __init__(self, path: str | Path, ttl: float | None = None) -> None:
+        self.path = Path(path)
+        self.ttl = ttl
+        self._index: dict[str, Path] | None = None
+        self._indexed_at = 0.0
+        self._values: dict[str, tuple[float, str]] = {}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({str(self.path)!r}, ttl={self.ttl})"
+
+    def _expired(self, since: float, now: float) -> bool:
+        return self.ttl is not None and now - since >= self.ttl
+
+    def _get_index(self) -> dict[str, Path]:
+        now = time.monotonic()
+        index = self._index
+        if index is None or self._expired(self._indexed_at, now):
+            index = {}
+            try:
+                with os.scandir(self.path) as entries:
+                    for entry in entries:
+                        # Skips Kubernetes' ..data and similar
+                        if not entry.name.startswith(".") and entry.is_file():
+                            index[entry.name.upper()] = Path(entry.path)
+            except FileNotFoundError:
+                pass
+            self._index = index
+            self._indexed_at = now
+        return index
+
+    def __getitem__(self, key: str) -> str:
+        now = time.monotonic()
+        cached = self._values.get(key)
+        if cached is not None and not self._expired(cached[0], now):
+            return cached[1]
+
+        path = self._get_index()[key.upper()]
+        try:
+            value = path.read_text(encoding="utf-8").rstrip("\r\n")
+        except FileNotFoundError:
+            raise KeyError(key) from None
+        self._values[key] = (now, value)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and key.upper() in self._get_index()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._get_index())
+
+    def __len__(self) -> int:
+        return len(self._get_index())
+
+
+def chain_environ(*sources: Mapping[str, str]) -> Mapping[str, str]:
+    """Return the variables of all sources, the first source that has one wins."""
+    return ChainMap(*sources)  # type: ignore[arg-type]
+
+
+_DOTENV_ESCAPES = {"n": "\n", "r": "\r", "t": "\t", '"': '"', "\\": "\\"}
+_DOTENV_ESCAPE = re.compile(r"\\(.)")
+
+
+def parse_dotenv(text: str) -> dict[str, str]:
+    r"""Parse the contents of a .env file.
+
+    Supports KEY=value lines with an optional export prefix, comments,
+    single quoted values taken literally, and double quoted values with
+    \n, \r, \t, \" and \\ escapes. Variables are not expanded.
+    """
+    values: dict[str, str] = {}
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        line = line.removeprefix("export ").lstrip()
+        key, sep, value = line.partition("=")
+        if not sep:
+            continue
+        value = value.strip()
+        quote = value[:1]
+        if quote in {"'", '"'} and len(value) > 1 and value.endswith(quote):
+            value = value[1:-1]
+            if quote == '"':
+                value = _DOTENV_ESCAPE.sub(
+                    lambda m: _DOTENV_ESCAPES.get(m[1], m[0]),
+                    value,
+                )
+        else:
+            value = value.partition(" #")[0].rstrip()
+        values[key.strip()] = value
+    return values
+
+
+class _DotEnvEntry(NamedTuple):
+    identity: tuple[int, int, int, int]
+    values: dict[str, str]
+    scopes: dict[str, dict[str, str]]
+
+
+_dotenv_cache: dict[str, _DotEnvEntry] = {}
+_dotenv_lock = threading.Lock()
+
+
+def read_dotenv(path: str | Path, prefix: str = "") -> dict[str, str]:
+    """Return the variables of a .env file, without touching os.environ.
+
+    With a prefix, only the variables whose names start with the prefix
+    and an underscore are returned. A missing file has no variables. The
+    file is parsed once, and parsed again only when its mtime, size or
+    inode change. The result is shared and must not be mutated.
+    """
+    abspath = Path(path).absolute()
+    try:
+        st = abspath.stat()
+    except FileNotFoundError:
+        return {}
+    identity = (st.st_mtime_ns, st.st_size, st.st_ino, st.st_dev)
+    key = str(abspath)
+
+    entry = _dotenv_cache.get(key)
+    if entry is None or entry.identity != identity:
+        values = parse_dotenv(abspath.read_text(encoding="utf-8"))
+        entry = _DotEnvEntry(identity, values, {})
+        with _dotenv_lock:
+            _dotenv_cache[key] = entry
+
+    if not prefix:
+        return entry.values
+
+    scope = entry.scopes.get(prefix)
+    if scope is None:
+        start = f"{prefix}_"
+        scope = {k: v for k, v in entry.values.items() if k.startswith(start)}
+        entry.scopes[prefix] = scope
+    return scope
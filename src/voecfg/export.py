@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+
+"""Stream loaded configs as JSON or TOML."""
+
+import base64
+import json
+import math
+import re
+from collections.abc import Callable, Iterator
+from datetime import date, datetime, time, timedelta
+from enum import Enum
+from pathlib import PurePath
+from typing import TYPE_CHECKING, Any, Protocol, overload
+
+if TYPE_CHECKING:  # pragma: no cover
+    from voecfg.base import _Base
+
+REDACTED = "**********"
+
+# Names of fields that are redacted even if they are not listed in _secrets.
+# Only whole parts of snake_case names match, e.g. db_password and
+# auth_token, but not max_tokens or secrets_dir.
+SECRET_NAME = re.compile(
+    r"(?:^|_)(?:passw(?:or)?d|secret|token|api_?key|private_?key|credential)(?:_|$)",
+    re.IGNORECASE,
+)
+
+_TOML_BARE_KEY = re.compile(r"[A-Za-z0-9_-]+")
+
+
+class Writer(Protocol):
+    """Anything with a write(str) method, e.g. a text file or io.StringIO."""
+
+    def write(self, data: str, /) -> Any:
+        """Write a chunk of the export and ignore the result."""
+
+
+def is_secret(config: "_Base", member: str) -> bool:
+    """Return True if the value of member should be redacted."""
+    return member in config._secrets or bool(  # noqa: SLF001
+        SECRET_NAME.search(member),
+    )
+
+
+def _root(config: "_Base") -> tuple[str, ...]:
+    """Return the key a config is nested under in as_dict(), if any."""
+    return config._export_root()  # noqa: SLF001
+
+
+def _node_items(
+    config: "_Base",
+    *,
+    redact: bool,
+    sort_keys: bool,
+) -> Iterator[tuple[str, Any, bool]]:
+    """Yield the key, value, and whether the value is a SubConfig."""
+    return config._export_items(redact=redact, sort_keys=sort_keys)  # noqa: SLF001
+
+
+def iter_items(
+    config: "_Base",
+    *,
+    redact: bool = True,
+    sort_keys: bool = True,
+) -> Iterator[tuple[tuple[str, ...], Any]]:
+    """Yield the path and value of every value in the config tree.
+
+    The paths have the same keys as as_dict(), so a BaseConfig's paths
+    start with its _prefix. Members listed in _secrets, or with names
+    like password or token, are replaced by REDACTED unless redact is
+    False.
+    """
+    yield from _iter_node(config, _root(config), redact=redact, sort_keys=sort_keys)
+
+
+def _iter_node(
+    config: "_Base",
+    path: tuple[str, ...],
+    *,
+    redact: bool,
+    sort_keys: bool,
+) -> Iterator[tuple[tuple[str, ...], Any]]:
+    for key, value, is_node in _node_items(config, redact=redact, sort_keys=sort_keys):
+        if is_node:
+            yield from _iter_node(
+                value,
+                (*path, key),
+                redact=redact,
+                sort_keys=sort_keys,
+            )
+        else:
+            yield (*path, key), value
+
+
+def to_builtin(value: Any) -> Any:
+    """Convert a value JSON can't represent to one it can.
+
+    Raises TypeError for values it doesn't know either.
+    """
+    if isinstance(value, PurePath):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode("ascii")
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, (set, frozenset)):
+        try:
+            return sorted(value)  # pyright: ignore
+        except TypeError:
+            return list(value)  # pyright: ignore
+    if isinstance(value, tuple):
+        return list(value)  # pyright: ignore
+
+    msg = f"Object of type {type(value).__name__} is not serializable"
+    raise TypeError(msg)
+
+
+def _json_chunks(
+    config: "_Base",
+    *,
+    redact: bool,
+    sort_keys: bool,
+) -> Iterator[str]:
+    root = _root(config)
+    for key in root:
+        yield "{" + json.dumps(key) + ":"
+    yield from _json_node(config, redact=redact, sort_keys=sort_keys)
+    yield "}" * len(root)
+
+
+def _json_node(config: "_Base", *, redact: bool, sort_keys: bool) -> Iterator[str]:
+    separator = "{"
+    for key, value, is_node in _node_items(config, redact=redact, sort_keys=sort_keys):
+        yield separator + json.dumps(key) + ":"
+        separator = ","
+        if is_node:
+            yield from _json_node(value, redact=redact, sort_keys=sort_keys)
+        else:
+            yield json.dumps(
+                value,
+                default=to_builtin,
+                sort_keys=sort_keys,
+                separators=(",", ":"),
+            )
+    yield "{}" if separator == "{" else "}"
+
+
+def _toml_key(key: str) -> str:
+    return key if _TOML_BARE_KEY.fullmatch(key) else json.dumps(key)
+
+
+def _toml_value(value: Any, *, sort_keys: bool) -> str:  # noqa: C901, PLR0911
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "nan"
+        if math.isinf(value):
+            return "inf" if value > 0 else "-inf"
+        return repr(value)
+    if isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        items = sorted(value.items()) if sort_keys else value.items()  # pyright: ignore
+        pairs = ", ".join(
+            f"{_toml_key(str(k))} = {_toml_value(v, sort_keys=sort_keys)}"
+            for k, v in items  # pyright: ignore
+            if v is not None
+        )
+        return "{ " + pairs + " }" if pairs else "{}"
+    if isinstance(value, (list, tuple, set, frozenset)):
+        if isinstance(value, (set, frozenset)):
+            value = to_builtin(value)
+        values = ", ".join(
+            _toml_value(v, sort_keys=sort_keys) for v in value
+        )  # pyright: ignore
+        return f"[{values}]"
+    return _toml_value(to_builtin(value), sort_keys=sort_keys)
+
+
+def _toml_chunks(
+    config: "_Base",
+    *,
+    redact: bool,
+    sort_keys: bool,
+) -> Iterator[str]:
+    yield from _toml_table(config, _root(config), redact=redact, sort_keys=sort_keys)
+
+
+def _toml_table(
+    config: "_Base",
+    table: tuple[str, ...],
+    *,
+    redact: bool,
+    sort_keys: bool,
+) -> Iterator[str]:
+    if table:
+        yield "[" + ".".join(_toml_key(key) for key in table) + "]\n"
+
+    # Values have to come before the sub-tables in TOML
+    subs: list[tuple[str, Any]] = []
+    for key, value, is_node in _node_items(config, redact=redact, sort_keys=sort_keys):
+        if is_node:
+            subs.append((key, value))
+        elif value is not None:
+            yield f"{_toml_key(key)} = {_toml_value(value, sort_keys=sort_keys)}\n"
+
+    for key, sub in subs:
+        yield "\n"
+        yield from _toml_table(sub, (*table, key), redact=redact, sort_keys=sort_keys)
+
+
+def _fingerprint(config: "_Base") -> list[Any]:
+    """Return the values of the config tree, to tell if any was replaced."""
+    values: list[Any] = []
+    for _, value, is_node in _node_items(config, redact=False, sort_keys=False):
+        values.append(value)
+        if is_node:
+            values.extend(_fingerprint(value))
+    return values
+
+
+def _export(
+    config: "_Base",
+    key: tuple[Any, ...],
+    chunks: Callable[[], Iterator[str]],
+    fp: Writer | None,
+) -> str | None:
+    """Write the export to fp, or return it, reusing the cached export."""
+    cache: dict[tuple[Any, ...], tuple[list[Any], str]] = config.__dict__.setdefault(
+        "_export_cache",
+        {},
+    )
+    fingerprint = _fingerprint(config)
+    cached = cache.get(key)
+    if (
+        cached is not None
+        and len(cached[0]) == len(fingerprint)
+        and all(a is b for a, b in zip(cached[0], fingerprint, strict=True))
+    ):
+        text = cached[1]
+    elif fp is not None:
+        # Stream, and cache what was written
+        parts: list[str] = []
+        for chunk in chunks():
+            fp.write(chunk)
+            parts.append(chunk)
+        cache[key] = (fingerprint, "".join(parts))
+        return None
+    else:
+        text = "".join(chunks())
+        cache[key] = (fingerprint, text)
+
+    if fp is None:
+        return text
+    fp.write(text)
+    return None
+
+
+@overload
+def dump_json(
+    config: "_Base",
+    fp: None = None,
+    *,
+    redact: bool = True,
+    sort_keys: bool = True,
+) -> str: ...
+
+
+@overload
+def dump_json(
+    config: "_Base",
+    fp: Writer,
+    *,
+    redact: bool = True,
+    sort_keys: bool = True,
+) -> None: ...
+
+
+def dump_json(
+    config: "_Base",
+    fp: Writer | None = None,
+    *,
+    redact: bool = True,
+    sort_keys: bool = True,
+) -> str | None:
+    """Write the config as compact JSON to fp, or return it if fp is None.
+
+    Secrets are redacted like in iter_items(), and values JSON can't
+    represent are converted by to_builtin(). The result is cached until
+    a value in the config is replaced, e.g. by reload(). Values changed
+    in place, e.g. by appending to a list, are not noticed.
+    """
+    return _export(
+        config,
+        ("json", redact, sort_keys),
+        lambda: _json_chunks(config, redact=redact, sort_keys=sort_keys),
+        fp,
+    )
+
+
+@overload
+def dump_toml(
+    config: "_Base",
+    fp: None = None,
+    *,
+    redact: bool = True,
+    sort_keys: bool = True,
+) -> str: ...
+
+
+@overload
+def dump_toml(
+    config: "_Base",
+    fp: Writer,
+    *,
+    redact: bool = True,
+    sort_keys: bool = True,
+) -> None: ...
+
+
+def dump_toml(
+    config: "_Base",
+    fp: Writer | None = None,
+    *,
+    redact: bool = True,
+    sort_keys: bool = True,
+) -> str | None:
+    """Write the config as TOML to fp, or return it if fp is None.
+
+    SubConfigs become tables. TOML has no null, so None values are left
+    out. Other values are converted like in dump_json().
+    """
+    return _export(
+        config,
+        ("toml", redact, sort_keys),
+        lambda: _toml_chunks(config, redact=redact, sort_keys=sort_keys),
+        fp,
+    )
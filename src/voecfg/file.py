@@ -2,54 +2,610 @@
 
 """Load files."""
 
-import contextlib
+import hashlib
+import importlib
 import json
+import mmap
+import os
+import pickle  # nosec B403
+import stat
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Collection, Hashable, Iterable
+from contextvars import ContextVar
 from pathlib import Path
-from types import ModuleType
-from typing import Any
+from typing import Any, NamedTuple
 
-toml: ModuleType | None = None
-with contextlib.suppress(ImportError):
-    import toml
+from voecfg.subtree import Buffer, select_toml
+from voecfg.trace import active_trace
+
+
+class Parser(NamedTuple):
+    """A decoder for a file format.
+
+    name: str, identifies the backend, and is part of the file cache key
+    loads: Callable[[bytes], Any], parse the raw contents of a file
+    error: type[Exception], raised by loads on invalid input
+    version: str, the version of the backend, part of the disk cache key
+    """
+
+    name: str
+    loads: Callable[[bytes], Any]
+    error: type[Exception]
+    version: str = ""
+
+    @property
+    def key(self) -> str:
+        """Identify the backend and its version in file cache keys."""
+        return f"{self.name}/{self.version}" if self.version else self.name
+
+
+_PYTHON_VERSION = "python-{}.{}.{}".format(*sys.version_info[:3])
+
+
+def _orjson_parser() -> Parser:
+    orjson = importlib.import_module("orjson")
+    return Parser(
+        "orjson",
+        orjson.loads,
+        orjson.JSONDecodeError,
+        getattr(orjson, "__version__", ""),
+    )
+
+
+def _json_parser() -> Parser:
+    return Parser("json", json.loads, json.JSONDecodeError, _PYTHON_VERSION)
+
+
+def _tomllib_parser(module: str) -> Callable[[], Parser]:
+    def _parser() -> Parser:
+        tomllib = importlib.import_module(module)
+
+        def _loads(data: bytes) -> Any:
+            return tomllib.loads(data.decode("utf-8"))
+
+        version = getattr(tomllib, "__version__", _PYTHON_VERSION)
+        return Parser(module, _loads, tomllib.TOMLDecodeError, version)
+
+    return _parser
+
+
+def _toml_parser() -> Parser:
+    toml = importlib.import_module("toml")
+
+    def _loads(data: bytes) -> Any:
+        return toml.loads(data.decode("utf-8"))
+
+    return Parser("toml", _loads, toml.TomlDecodeError, toml.__version__)
+
+
+def _import_parser(candidate: Callable[[], Parser]) -> Parser | None:
+    try:
+        return candidate()
+    except ImportError:
+        return None
+
+
+def select_parser(candidates: Iterable[Callable[[], Parser]]) -> Parser | None:
+    """Return the first parser whose backend can be imported."""
+    for candidate in candidates:
+        parser = _import_parser(candidate)
+        if parser is not None:
+            return parser
+    return None
+
+
+_JSON_PARSERS = {"json": _json_parser, "orjson": _orjson_parser}
+
+
+def default_json_parser() -> Parser:
+    """Return the JSON parser named by VOECFG_JSON_PARSER, json by default.
+
+    orjson is faster, but is opt-in since it parses some documents
+    differently: integers beyond 64 bits lose precision, and NaN and
+    Infinity are rejected. Falls back to json if orjson isn't installed.
+    """
+    name = os.environ.get("VOECFG_JSON_PARSER") or "json"
+    candidate = _JSON_PARSERS.get(name)
+    if candidate is None:
+        msg = f"Unknown VOECFG_JSON_PARSER: {name}, expected json or orjson"
+        raise ValueError(msg)
+    return select_parser((candidate, _json_parser))  # type: ignore[return-value]
+
+
+JSON_PARSER = default_json_parser()
+TOML_PARSER = select_parser(
+    (_tomllib_parser("tomllib"), _tomllib_parser("tomli"), _toml_parser),
+)
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a FileCache."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+def _copy_parsed(value: Any) -> Any:
+    """Copy the containers of a parsed document, sharing the scalars."""
+    if isinstance(value, dict):
+        return {k: _copy_parsed(v) for k, v in value.items()}  # pyright: ignore
+    if isinstance(value, list):
+        return [_copy_parsed(v) for v in value]  # pyright: ignore
+    return value
+
+
+_DISK_FORMAT = ("voecfg-parsed", 1)
+
+
+def _is_private(st: os.stat_result) -> bool:
+    """Return True if only the current user can have written the file."""
+    if st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        return False
+    getuid = getattr(os, "getuid", None)
+    return getuid is None or st.st_uid == getuid()
+
+
+class FileCache:
+    """A process-wide LRU cache of parsed files.
+
+    Entries are keyed by the absolute path and the parser, and are only
+    reused while the file's mtime, size and inode are unchanged.
+    Every load returns a fresh copy, so callers are free to mutate it.
+
+    With cache_dir set, parsed files are also stored there, like .pyc
+    files, so new processes can skip parsing unchanged files. The entries
+    are pickles, so they are only read if they, and cache_dir, are owned
+    by the current user and not writable by group or others. cache_dir
+    is created private, and defaults to the VOECFG_CACHE_DIR environment
+    variable.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        cache_dir: str | Path | None = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.cache_dir = None if cache_dir is None else Path(cache_dir)
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._entries: OrderedDict[tuple[str, str], tuple[Any, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(
+        self,
+        path: str | Path,
+        parser: str,
+        parse: Callable[[bytes], Any],
+        *,
+        use_mmap: bool = False,
+    ) -> Any:
+        """Return the parsed contents of path, parsing it only when it changed.
+
+        With use_mmap, parse is handed a read-only mmap of the file instead
+        of its bytes, and must not keep a reference to it.
+        """
+        return _copy_parsed(
+            self.load_shared(path, parser, parse, use_mmap=use_mmap),
+        )
+
+    def load_shared(
+        self,
+        path: str | Path,
+        parser: str,
+        parse: Callable[[bytes], Any],
+        *,
+        use_mmap: bool = False,
+    ) -> Any:
+        """Like load(), but return the cached object itself.
+
+        The result is shared with every other caller and must not be mutated.
+        """
+        abspath = Path(path).absolute()
+        key = (str(abspath), parser)
+        st = abspath.stat()
+        identity = (st.st_mtime_ns, st.st_size, st.st_ino, st.st_dev)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == identity:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                hit = True
+            else:
+                self.misses += 1
+                hit = False
+
+        trace = active_trace()
+        if hit:
+            if trace is not None:
+                trace.file_cache_hits += 1
+            return entry[1]  # type: ignore[index]
+
+        disk_path = self._disk_path(key)
+        found, data = self._read_disk(disk_path, identity)
+        if found:
+            with self._lock:
+                self.disk_hits += 1
+            if trace is not None:
+                trace.file_cache_hits += 1
+        else:
+            data = self._parse(abspath, st.st_size, parse, use_mmap=use_mmap)
+            if disk_path is not None:
+                self._write_disk(disk_path, identity, data)
+
+        if self.maxsize > 0:
+            with self._lock:
+                self._entries[key] = (identity, data)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+        return data
+
+    def _parse(
+        self,
+        abspath: Path,
+        size: int,
+        parse: Callable[[bytes], Any],
+        *,
+        use_mmap: bool,
+    ) -> Any:
+        trace = active_trace()
+        if trace is not None:
+            trace.files_read += 1
+            trace.bytes_parsed += size
+
+        start = time.perf_counter()
+        if use_mmap and size:
+            with abspath.open("rb") as f, mmap.mmap(
+                f.fileno(),
+                0,
+                access=mmap.ACCESS_READ,
+            ) as buf:
+                # With use_mmap, parse accepts any Buffer
+                data = parse(buf)  # type: ignore[arg-type]
+        else:
+            data = parse(abspath.read_bytes())
+        if trace is not None:
+            trace.add("parse", time.perf_counter() - start)
+        return data
+
+    def _disk_path(self, key: tuple[str, str]) -> Path | None:
+        """Return where the entry for key is stored on disk, if anywhere."""
+        if self.cache_dir is None:
+            return None
+        digest = hashlib.sha256("\0".join(key).encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{digest}.pickle"
+
+    def _read_disk(self, disk_path: Path | None, identity: Any) -> tuple[bool, Any]:
+        """Return (True, data) if disk_path holds data for identity."""
+        if disk_path is None:
+            return False, None
+        try:
+            # Anyone who can write the entries can run code in this process
+            if not _is_private(disk_path.parent.stat()):
+                return False, None
+            with disk_path.open("rb") as f:
+                if not _is_private(os.fstat(f.fileno())):
+                    return False, None
+                stored = pickle.load(f)  # noqa: S301  # nosec B301
+            kind, version, stored_identity, data = stored
+        except Exception:  # noqa: BLE001
+            # Missing, corrupt or foreign entries are replaced by the next write
+            return False, None
+
+        if (kind, version) != _DISK_FORMAT or tuple(stored_identity) != identity:
+            return False, None
+        return True, data
+
+    def _write_disk(self, disk_path: Path, identity: Any, data: Any) -> None:
+        """Store data at disk_path, atomically, ignoring errors."""
+        try:
+            disk_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            if not _is_private(disk_path.parent.stat()):
+                return
+            fd, tmp = tempfile.mkstemp(dir=disk_path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(
+                        (*_DISK_FORMAT, identity, data),
+                        f,
+                        protocol=pickle.HIGHEST_PROTOCOL,
+                    )
+                Path(tmp).replace(disk_path)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+        except (OSError, pickle.PicklingError):
+            # The disk cache is only an optimization
+            return
+
+    def invalidate(self, path: str | Path | None = None) -> None:
+        """Drop the cached entries for path, or every entry if path is None.
+
+        Entries in cache_dir are left alone, they are validated on load.
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+
+            abspath = str(Path(path).absolute())
+            for key in [k for k in self._entries if k[0] == abspath]:
+                del self._entries[key]
+
+    def info(self) -> CacheInfo:
+        """Return the hit and miss counters and the current size."""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+
+file_cache = FileCache(cache_dir=os.environ.get("VOECFG_CACHE_DIR") or None)
 
 
 class File:
-    """A file."""
+    """A file.
+
+    Subclasses either override load(), or set parser to have the file
+    parsed and cached through file_cache.
+
+    Class variables:
+        parser: None | Parser, the decoder for the file format
+        suffixes: tuple[str, ...], file suffixes handled by the class
+        content_types: tuple[str, ...], content types handled by the class
+    """
+
+    parser: Parser | None = None
+    suffixes: tuple[str, ...] = ()
+    content_types: tuple[str, ...] = ()
 
     def __init__(self, path: str | Path):
         self.path = path
 
     def load(self) -> Any:
         """Load the file."""
-        raise NotImplementedError
+        if self.parser is None:
+            raise NotImplementedError
+        return file_cache.load(self.path, self.parser.key, self.parser.loads)
+
+    def stamp(self) -> Hashable:
+        """Return a value that changes when the file changes.
+
+        Used by ConfigWatcher to decide when to reload. The default is
+        the file's mtime, size and inode, or None if it can't be stat'ed.
+        """
+        try:
+            st = Path(self.path).stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino, st.st_dev)
+
+    def load_shared(self) -> Any:
+        """Like load(), but the result may be shared and must not be mutated.
+
+        Files with a parser return the object held by file_cache, which
+        stays the same object while the file is unchanged.
+        """
+        if self.parser is None:
+            return self.load()
+        return file_cache.load_shared(self.path, self.parser.key, self.parser.loads)
+
+    def load_keys(self, keys: Collection[str]) -> Any:
+        """Load only the given top-level keys of the file.
+
+        The default implementation parses the whole file, shared through
+        file_cache with load(), and copies only the given keys. Formats
+        that can skip parts of a document override this.
+        """
+        data = self.load_shared()
+        if isinstance(data, dict):
+            return {
+                k: _copy_parsed(v)
+                for k, v in data.items()  # pyright: ignore
+                if k in keys
+            }
+        return _copy_parsed(data)
+
+    def _load_selected(
+        self,
+        keys: Collection[str],
+        select: Callable[[Buffer, Collection[str], Callable[[bytes], Any]], Any],
+    ) -> Any:
+        if self.parser is None:  # pragma: no cover
+            raise NotImplementedError
+        loads = self.parser.loads
+        return file_cache.load(
+            self.path,
+            f"{self.parser.key}{sorted(keys)}",
+            lambda buf: select(buf, keys, loads),
+            use_mmap=True,
+        )
 
 
 class JSONFile(File):
     """A JSON file."""
 
-    def load(self) -> Any:
-        """Load the file."""
-        with Path(self.path).open() as f:
-            return json.load(f)
+    parser = JSON_PARSER
+    suffixes = (".json",)
+    content_types = ("application/json",)
 
 
 class TOMLFile(File):
     """A TOML file."""
 
+    parser = TOML_PARSER
+    suffixes = (".toml",)
+    content_types = ("application/toml",)
+
     def __init__(self, path: str | Path):
-        if not toml:
-            msg = "The toml package is required for toml_file to work."
+        if not self.parser:
+            msg = "A TOML parser (tomllib, tomli or toml) is required for toml_file."
             raise ImportError(msg)
         super().__init__(path)
 
+    def load_keys(self, keys: Collection[str]) -> Any:
+        """Load only the tables under the given top-level keys."""
+        return self._load_selected(keys, select_toml)
+
+
+class LayeredFile(File):
+    """Files deep-merged in order, so later files override earlier ones.
+
+    Dicts are merged key by key, anything else in a later file replaces
+    the value from the earlier ones. Every layer is parsed through
+    file_cache, and the merge is memoized: when a layer changes, only
+    the top-level keys whose values changed in some layer are merged
+    again.
+    """
+
+    def __init__(self, layers: Iterable[File]) -> None:
+        self.layers = tuple(layers)
+        super().__init__(", ".join(str(layer.path) for layer in self.layers))
+        self._lock = threading.Lock()
+        # The layers the memo was built from, and the merged result per key
+        self._memo_layers: list[Any] = []
+        self._memo: dict[str, Any] = {}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self.layers)!r})"
+
     def load(self) -> Any:
-        """Load the file."""
-        data: Any = None
-        if toml:
-            with Path(self.path).open() as f:
-                data = toml.load(f)
+        """Load and merge the layers."""
+        return _copy_parsed(self.load_shared())
 
-        return data
+    def load_shared(self) -> Any:
+        """Like load(), but return the memoized merge itself."""
+        layers = [layer.load_shared() for layer in self.layers]
+        if not all(isinstance(layer, dict) for layer in layers):
+            return _merge_layers(layers)
+
+        with self._lock:
+            old_layers = self._memo_layers
+            memo = self._memo
+            if len(old_layers) != len(layers):
+                old_layers = [{}] * len(layers)
+                memo = {}
+
+            merged: dict[str, Any] = {}
+            for key in dict.fromkeys(k for layer in layers for k in layer):
+                values = [layer.get(key, _MISSING) for layer in layers]
+                old_values = [layer.get(key, _MISSING) for layer in old_layers]
+                unchanged = key in memo and all(
+                    new is old or new == old
+                    for new, old in zip(values, old_values, strict=True)
+                )
+                merged[key] = (
+                    memo[key]
+                    if unchanged
+                    else _merge_layers([v for v in values if v is not _MISSING])
+                )
+
+            self._memo_layers = layers
+            self._memo = merged
+        return merged
+
+    def load_keys(self, keys: Collection[str]) -> Any:
+        """Load and merge only the given top-level keys of every layer."""
+        return _merge_layers([layer.load_keys(keys) for layer in self.layers])
+
+    def stamp(self) -> Hashable:
+        """Return the stamps of all layers."""
+        return tuple(layer.stamp() for layer in self.layers)
+
+
+_MISSING = object()
+
+
+def _merge_layers(layers: list[Any]) -> Any:
+    """Deep-merge values, later ones winning, without mutating them."""
+    if not layers:
+        return {}
+    if len(layers) == 1 or not all(isinstance(layer, dict) for layer in layers):
+        return layers[-1]
+
+    merged: dict[str, Any] = {}
+    for key in dict.fromkeys(k for layer in layers for k in layer):
+        merged[key] = _merge_layers([layer[key] for layer in layers if key in layer])
+    return merged
+
+
+def layered_file(*layers: File | str | Path) -> LayeredFile:
+    """Return a LayeredFile of the given files, later ones winning.
+
+    str and Path layers use the File type registered for their suffix.
+    """
+    return LayeredFile(as_file(layer) for layer in layers)
+
+
+def as_file(path: File | str | Path) -> File:
+    """Return path as a File, using the File type registered for its suffix."""
+    if isinstance(path, File):
+        return path
+
+    file_cls = file_type_for_path(path)
+    if file_cls is None:
+        msg = f"Unknown file type: {path}"
+        raise ValueError(msg)
+    return file_cls(path)
+
+
+# Values of File members read ahead of time, e.g. by voecfg.aload(),
+# by the id() of the File
+preloaded_files: ContextVar[dict[int, Any] | None] = ContextVar(
+    "voecfg_preloaded_files",
+    default=None,
+)
+
+
+def load_file(file: File) -> Any:
+    """Return file.load(), or the value preloaded for the file.
+
+    A preloaded value is only used once, so the same File used twice
+    doesn't hand out the same object twice.
+    """
+    preloaded = preloaded_files.get()
+    if preloaded:
+        try:
+            return preloaded.pop(id(file))
+        except KeyError:
+            pass
+    return file.load()
+
+
+_file_types: dict[str, type[File]] = {}
+
+
+def register_file_type(file_cls: type[File]) -> type[File]:
+    """Register a File subclass for its suffixes and content types.
+
+    Later registrations win, so this can also replace the built-in
+    JSON and TOML handling. Can be used as a class decorator.
+    """
+    for key in (*file_cls.suffixes, *file_cls.content_types):
+        _file_types[key.lower()] = file_cls
+    return file_cls
+
+
+def file_type_for_path(path: str | Path) -> type[File] | None:
+    """Return the File subclass registered for the suffix of path."""
+    return _file_types.get(Path(path).suffix.lower())
+
+
+def file_type_for_content_type(content_type: str) -> type[File] | None:
+    """Return the File subclass registered for a content type."""
+    return _file_types.get(content_type.split(";", 1)[0].strip().lower())
+
+
+register_file_type(JSONFile)
+register_file_type(TOMLFile)
 
 
 def json_file(path: str | Path) -> Any:
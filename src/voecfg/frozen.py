@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+"""Immutable, slotted views of loaded configs."""
+
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
+
+from voecfg.schema import SUB
+
+if TYPE_CHECKING:  # pragma: no cover
+    from voecfg.base import _Base
+
+
+def freeze_value(value: Any) -> Any:
+    """Return value with its containers replaced by immutable ones.
+
+    dicts become read-only mappings, lists and tuples become tuples,
+    and sets become frozensets, recursively.
+    """
+    if isinstance(value, Mapping) and not isinstance(value, MappingProxyType):
+        return MappingProxyType(
+            {k: freeze_value(v) for k, v in value.items()},  # pyright: ignore
+        )
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_value(v) for v in value)  # pyright: ignore
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze_value(v) for v in value)  # pyright: ignore
+    return value
+
+
+def _hashable(value: Any) -> Any:
+    """Return a hashable stand-in for a frozen value."""
+    if isinstance(value, MappingProxyType):
+        return frozenset((k, _hashable(v)) for k, v in value.items())
+    if isinstance(value, tuple):
+        return tuple(_hashable(v) for v in value)  # pyright: ignore
+    return value
+
+
+class FrozenConfig:
+    """An immutable view of a loaded config.
+
+    Subclasses are generated per config class, with a slot per field.
+    Views compare equal when their classes and values are equal, and
+    are hashable as long as the values are.
+
+    Class variables:
+        _fields: tuple[str, ...], the names of the fields, in order
+    """
+
+    __slots__ = ()
+
+    _fields: tuple[str, ...] = ()
+
+    if TYPE_CHECKING:  # pragma: no cover
+        # The fields are slots of the generated subclasses
+        def __getattr__(self, name: str) -> Any: ...
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        msg = f"{self.__class__.__name__} is frozen, can't set {name}"
+        raise AttributeError(msg)
+
+    def __delattr__(self, name: str) -> None:
+        msg = f"{self.__class__.__name__} is frozen, can't delete {name}"
+        raise AttributeError(msg)
+
+    def _values(self) -> tuple[tuple[str, Any], ...]:
+        # Fields of configs loaded with include may not be set
+        return tuple(
+            (name, getattr(self, name)) for name in self._fields if hasattr(self, name)
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._values() == other._values()  # type: ignore[attr-defined]
+
+    def __hash__(self) -> int:
+        return hash((self.__class__, _hashable(self._values())))
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={value!r}" for name, value in self._values())
+        return f"{self.__class__.__name__}({values})"
+
+
+def _frozen_class(config_cls: type["_Base"], fields: tuple[str, ...]) -> type:
+    """Return the FrozenConfig subclass for a config class, creating it once."""
+    frozen_cls: type | None = config_cls.__dict__.get("_voecfg_frozen")
+    # Members added to the class later change the fields
+    if frozen_cls is None or frozen_cls._fields != fields:  # type: ignore[attr-defined]
+        frozen_cls = type(
+            f"Frozen{config_cls.__name__}",
+            (FrozenConfig,),
+            {
+                "__slots__": fields,
+                "__module__": config_cls.__module__,
+                "__qualname__": f"Frozen{config_cls.__qualname__}",
+                "_fields": fields,
+            },
+        )
+        config_cls._voecfg_frozen = frozen_cls  # noqa: SLF001
+    return frozen_cls
+
+
+def freeze(config: "_Base") -> FrozenConfig:
+    """Return an immutable, slotted copy of the values of a loaded config.
+
+    SubConfigs are frozen as well, and dicts, lists and sets become
+    read-only mappings, tuples and frozensets. The copy is safe to
+    share between threads, and doesn't follow reload().
+    """
+    schema = config._schema  # noqa: SLF001
+    frozen_cls = _frozen_class(
+        config.__class__,
+        tuple(field.name for field in schema.fields),
+    )
+
+    frozen: FrozenConfig = object.__new__(frozen_cls)
+    for field in schema.fields:
+        if config._is_excluded(field.name):  # noqa: SLF001
+            continue
+        value = getattr(config, field.name)
+        value = freeze(value) if field.kind == SUB else freeze_value(value)
+        object.__setattr__(frozen, field.name, value)
+    return frozen
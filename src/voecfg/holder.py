@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+"""Publish new versions of a config without disturbing readers."""
+
+import threading
+from collections.abc import Callable
+from typing import Generic, TypeVar, cast
+
+from voecfg.base import BaseConfig
+from voecfg.changes import Change, Subscribers, check_path, diff
+from voecfg.file import File
+
+_C = TypeVar("_C", bound=BaseConfig)
+
+
+class ConfigHolder(Generic[_C]):
+    """Hold the current generation of a config, read-copy-update style.
+
+    Every new generation is built completely on the side, and published
+    by replacing the current attribute, so readers see either the old or
+    the new config, never a mix. Readers take no locks: a read is one
+    attribute lookup. Keep the config in a local variable to read several
+    values from the same generation:
+
+        config = holder.current
+        connect(config.db.host, config.db.port)
+
+    Published configs are never changed, so old generations are freed as
+    soon as the last reader drops them. A ConfigWatcher can watch a
+    holder instead of a config, and then publishes the reloads.
+    Subscribers are told what changed after every publish.
+    """
+
+    __slots__ = ("_factory", "_lock", "_subscribers", "current", "generation")
+
+    def __init__(self, factory: Callable[[], _C]) -> None:
+        """Build the first generation with factory, e.g. the config class."""
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._subscribers = Subscribers()
+        self.current: _C = factory()
+        self.generation = 1
+
+    def __repr__(self) -> str:
+        name = type(self.current).__name__
+        return f"<{self.__class__.__name__} {name} generation {self.generation}>"
+
+    def publish(self, config: _C) -> None:
+        """Make config the current generation."""
+        with self._lock:
+            old = self.current
+            self.current = config
+            self.generation += 1
+        self._notify(old, config)
+
+    def refresh(self) -> _C:
+        """Build a new generation from scratch with the factory, and publish it."""
+        config = self._factory()
+        self.publish(config)
+        return config
+
+    def reload(self) -> bool:
+        """Publish a new generation if the files of the current one changed.
+
+        Like voecfg.reload(), only the changed subtrees are resolved
+        again, and the rest is shared with the current generation.
+        Returns True if a new generation was published.
+        """
+        with self._lock:
+            current = self.current
+            reloaded = current._reloaded(current._load_parent_dict())  # noqa: SLF001
+            if reloaded is None:
+                return False
+            # _reloaded() returns a copy of current, so of the same class
+            config = cast("_C", reloaded)
+            self.current = config
+            self.generation += 1
+        self._notify(current, config)
+        return True
+
+    def subscribe(
+        self,
+        path: str,
+        callback: Callable[[list[Change]], None],
+    ) -> Callable[[], None]:
+        """Call callback with the changes at or below path after every publish.
+
+        See voecfg.subscribe() for the paths. Callbacks run in the
+        thread that published, after the new generation is current.
+        Returns a function that unsubscribes the callback.
+        """
+        check_path(self.current, path)
+        return self._subscribers.subscribe(path, callback)
+
+    def _notify(self, old: BaseConfig, new: BaseConfig) -> None:
+        if self._subscribers:
+            self._subscribers.notify(diff(old, new))
+
+    def _watched_files(self) -> list[File]:
+        return self.current._watched_files()  # noqa: SLF001
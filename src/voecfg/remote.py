@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+
+"""Load config documents over HTTP."""
+
+import http.client
+import logging
+import os
+import tempfile
+import threading
+from collections.abc import Hashable
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+from voecfg.file import (
+    File,
+    Parser,
+    _copy_parsed,
+    file_type_for_content_type,
+    file_type_for_path,
+)
+
+logger = logging.getLogger(__name__)
+
+_Connection = http.client.HTTPConnection
+
+
+class ConnectionPool:
+    """Idle keep-alive connections, by scheme, host and port."""
+
+    def __init__(self, maxsize: int = 4) -> None:
+        self.maxsize = maxsize
+        self._idle: dict[tuple[str, str, int | None], list[_Connection]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, scheme: str, host: str, port: int | None, timeout: float) -> Any:
+        """Return an idle connection, or a new one."""
+        key = (scheme, host, port)
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                connection = idle.pop()
+                connection.timeout = timeout
+                return connection
+
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def release(self, scheme: str, connection: _Connection) -> None:
+        """Return a connection whose response was read in full to the pool."""
+        key = (scheme, connection.host, connection.port)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.maxsize:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def clear(self) -> None:
+        """Close every idle connection."""
+        with self._lock:
+            idle = [c for connections in self._idle.values() for c in connections]
+            self._idle.clear()
+        for connection in idle:
+            connection.close()
+
+
+connection_pool = ConnectionPool()
+
+
+class RemoteFile(File):
+    """A config document served over HTTP.
+
+    Documents are revalidated with If-None-Match on every load, so an
+    unchanged document costs a 304 and no parsing. Connections are kept
+    alive in connection_pool. When the server can't be reached, or
+    answers with an error, the last document that was loaded is used,
+    from memory or from cache_path, which is kept up to date if set.
+
+    The format is taken from parser, or from the File type registered
+    for the Content-Type of the response, or for the suffix of the URL,
+    or for the suffix of cache_path when loading from there.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        parser: Parser | None = None,
+        cache_path: str | Path | None = None,
+        timeout: float = 10.0,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        super().__init__(url)
+        parts = urlsplit(url)
+        if parts.scheme not in {"http", "https"} or not parts.hostname:
+            msg = f"Unsupported URL: {url}"
+            raise ValueError(msg)
+
+        self.url = url
+        self.parser = parser
+        self.cache_path = None if cache_path is None else Path(cache_path)
+        self.timeout = timeout
+        self.headers = headers or {}
+        self._scheme = parts.scheme
+        self._host = parts.hostname
+        self._port = parts.port
+        self._target = parts.path or "/"
+        if parts.query:
+            self._target += f"?{parts.query}"
+
+        self._lock = threading.Lock()
+        self._etag: str | None = None
+        self._data: Any = None
+        self._loaded = False
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.url!r})"
+
+    def load(self) -> Any:
+        """Return the document, fetching it only if it changed."""
+        return _copy_parsed(self.load_shared())
+
+    def load_shared(self) -> Any:
+        """Like load(), but return the parsed document itself."""
+        with self._lock:
+            try:
+                self._revalidate()
+            except (OSError, http.client.HTTPException) as e:
+                if not self._loaded and not self._load_last_known_good():
+                    msg = f"Could not load {self.url}: {e}"
+                    raise OSError(msg) from e
+                logger.warning("Using the last known good copy of %s: %s", self.url, e)
+            return self._data
+
+    def stamp(self) -> Hashable:
+        """Return the ETag of the document, revalidating it first."""
+        try:
+            self.load_shared()
+        except OSError:
+            return None
+        return self._etag
+
+    def _revalidate(self) -> None:
+        headers = {"Accept-Encoding": "identity", **self.headers}
+        if self._loaded and self._etag is not None:
+            headers["If-None-Match"] = self._etag
+
+        response, body = self._request(headers)
+
+        if response.status == http.client.NOT_MODIFIED and self._loaded:
+            return
+        if response.status != http.client.OK:
+            msg = f"{response.status} {response.reason}"
+            raise http.client.HTTPException(msg)
+
+        parser = self._parser_for(response.getheader("Content-Type"))
+        self._data = parser.loads(body)
+        self._etag = response.getheader("ETag")
+        self._loaded = True
+        self._store_last_known_good(body)
+
+    def _request(self, headers: dict[str, str]) -> tuple[Any, bytes]:
+        """Send a GET, retrying once if a pooled connection went stale."""
+        for attempt in range(2):
+            connection = connection_pool.acquire(
+                self._scheme,
+                self._host,
+                self._port,
+                self.timeout,
+            )
+            reused = connection.sock is not None
+            try:
+                connection.request("GET", self._target, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                # The server may have closed an idle connection
+                if reused and attempt == 0:
+                    continue
+                raise
+
+            if response.will_close:
+                connection.close()
+            else:
+                connection_pool.release(self._scheme, connection)
+            return response, body
+
+        raise AssertionError  # pragma: no cover
+
+    def _parser_for(self, content_type: str | None, path: str | Path = "") -> Parser:
+        if self.parser is not None:
+            return self.parser
+
+        file_cls = None
+        if content_type:
+            file_cls = file_type_for_content_type(content_type)
+        if file_cls is None:
+            file_cls = file_type_for_path(path or self._target.partition("?")[0])
+        if file_cls is None or file_cls.parser is None:
+            msg = f"Unknown file type: {self.url} ({content_type})"
+            raise ValueError(msg)
+
+        # Later loads get the same parser, even without a Content-Type
+        self.parser = file_cls.parser
+        return file_cls.parser
+
+    def _store_last_known_good(self, body: bytes) -> None:
+        if self.cache_path is None:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.cache_path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+            Path(tmp).replace(self.cache_path)
+        except OSError:
+            logger.exception("Could not store %s in %s", self.url, self.cache_path)
+
+    def _load_last_known_good(self) -> bool:
+        if self.cache_path is None:
+            return False
+        try:
+            body = self.cache_path.read_bytes()
+        except OSError:
+            return False
+        # Without a Content-Type, the suffix of cache_path tells the format
+        self._data = self._parser_for(None, self.cache_path).loads(body)
+        self._loaded = True
+        return True
+
+
+def remote_file(url: str, **options: Any) -> RemoteFile:
+    """Return a RemoteFile instance."""
+    return RemoteFile(url, **options)
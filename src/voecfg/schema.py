@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+
+"""Compiled config class layout and generated loaders."""
+
+import copy
+import keyword
+import time
+from collections.abc import Callable, Mapping
+from typing import Any, get_origin
+
+from voecfg.file import load_file
+from voecfg.trace import CountingEnviron, active_trace
+from voecfg.utils import convert_env_value, get_checker, get_converter
+
+SUB = "sub"
+FILE = "file"
+VALUE = "value"
+
+Loader = Callable[[Any, Any, list[str], list[str], Mapping[str, str]], None]
+
+
+class Field:
+    """A compiled member of a config class."""
+
+    __slots__ = (
+        "checker",
+        "converter",
+        "default",
+        "env_suffix",
+        "expected",
+        "expected_origin",
+        "kind",
+        "member_type",
+        "name",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        default: Any,
+        member_type: Any,
+        expected: Any,
+        annotation: Any = None,
+    ) -> None:
+        self.name = name
+        self.kind = kind
+        self.default = default
+        self.member_type = member_type
+        self.expected = expected
+        self.expected_origin = get_origin(expected) or expected
+        self.env_suffix = f"_{name}".upper()
+
+        # The full annotation, e.g. list[int], knows more than the type
+        # of the default value
+        if annotation is None:
+            self.converter = get_converter(member_type)
+            self.checker = get_checker(expected)
+        else:
+            self.converter = get_converter(annotation)
+            self.checker = get_checker(annotation)
+
+    def replace(self, **changes: Any) -> "Field":
+        """Return a copy of the field with some attributes changed."""
+        field = copy.copy(self)
+        for name, value in changes.items():
+            setattr(field, name, value)
+        return field
+
+
+class Schema:
+    """The members of a config class, resolved once per class.
+
+    Holds what _get_members() finds through reflection, plus the
+    fields _setup() walks, in the same order as before.
+    """
+
+    __slots__ = ("fields", "loaders", "members", "type_hints")
+
+    def __init__(self, members: dict[str, Any], type_hints: dict[str, Any]) -> None:
+        self.members = members
+        self.type_hints = type_hints
+        self.fields: tuple[Field, ...] = ()
+        self.loaders: dict[tuple[str, bool, bool], Loader] = {}
+
+    def get_loader(
+        self,
+        env_prefix: str,
+        strict: bool,  # noqa: FBT001
+        *,
+        traced: bool = False,
+    ) -> Loader:
+        """Return the generated loader for a position in the config tree."""
+        key = (env_prefix, strict, traced)
+        loader = self.loaders.get(key)
+        if loader is None:
+            loader = make_loader(self.fields, env_prefix, strict=strict, traced=traced)
+            self.loaders[key] = loader
+        return loader
+
+
+class LazyField:
+    """Resolve a field on first access, then keep the value on the instance.
+
+    Installed for every field when the schema of a class is compiled. This
+    is a non-data descriptor, so once the value is set on the instance,
+    reads are plain attribute lookups. Fields of instances loaded without
+    them, through include, raise AttributeError instead of returning the
+    class default. Fields without a default are missing from the class,
+    as they would be without the descriptor, so subclasses compile the
+    same schema whether or not the class was used first.
+    """
+
+    __slots__ = ("field", "has_default", "replaced")
+
+    def __init__(self, field: Field, *, has_default: bool, replaced: bool) -> None:
+        self.field = field
+        # Whether the class has a default, and defines it itself
+        self.has_default = has_default
+        self.replaced = replaced
+
+    def __get__(self, instance: Any, _owner: type) -> Any:
+        if instance is not None and instance._is_excluded(  # noqa: SLF001
+            self.field.name,
+        ):
+            raise instance._not_loaded(self.field.name)  # noqa: SLF001
+
+        # Not set up yet, e.g. while a subclass is being inspected
+        state = None if instance is None else instance.__dict__.get("_lazy_state")
+        if state is None:
+            if not self.has_default:
+                # Like the plain class, without the descriptor
+                name = self.field.name
+                if instance is None:
+                    msg = f"type object {_owner.__name__!r} has no attribute {name!r}"
+                else:
+                    msg = f"{_owner.__name__!r} object has no attribute {name!r}"
+                raise AttributeError(msg)
+            return self.field.default
+
+        instance._setup_field(self.field, *state)  # noqa: SLF001
+        return instance.__dict__[self.field.name]
+
+
+def _not_set(names: list[str], member: str, env_key: str) -> ValueError:
+    var_path = ".".join([*names, member])
+    return ValueError(f"Value for {var_path} / {env_key} not set.")
+
+
+def _wrong_type(
+    names: list[str],
+    member: str,
+    env_key: str,
+    value: Any,
+    expected_origin: Any,
+) -> TypeError:
+    var_path = ".".join([*names, member])
+    return TypeError(
+        f"{var_path} / {env_key} is {type(value)}, expected {expected_origin}",
+    )
+
+
+def _timed(lines: list[str], phase: str, *, traced: bool) -> list[str]:
+    """Wrap generated lines, so traced loaders time them as a phase."""
+    if not traced:
+        return lines
+    indent = lines[0][: len(lines[0]) - len(lines[0].lstrip())]
+    return [
+        f"{indent}step = _clock()",
+        *lines,
+        f"{indent}trace.add({phase!r}, _clock() - step)",
+    ]
+
+
+def _record(field: Field) -> str:
+    """Return the line a traced loader records the time of a field with."""
+    if field.kind == SUB:
+        path = f"'.'.join([*names, {field.name!r}])"
+        return f"    trace.subconfigs[{path}] = _clock() - start"
+    phase = "file_members" if field.kind == FILE else "values"
+    return f"    trace.add({phase!r}, _clock() - start)"
+
+
+def _field_lines(
+    field: Field,
+    index: int,
+    env_prefix: str,
+    namespace: dict[str, Any],
+    *,
+    strict: bool,
+    traced: bool,
+) -> list[str]:
+    """Return the lines that load one field, adding its constants to namespace."""
+    member = field.name
+    env_key = env_prefix + field.env_suffix
+    default = f"_default_{index}"
+    namespace[default] = field.default
+
+    if member.isidentifier() and not keyword.iskeyword(member):
+        assign = f"    self.{member} = value"
+    else:  # pragma: no cover
+        assign = f"    setattr(self, {member!r}, value)"
+
+    if field.kind == SUB:
+        return [
+            f"    value = _copy({default})",
+            "    value._setup(current, [*prefixes], [*names], root_environ)",
+            assign,
+        ]
+
+    lines: list[str] = []
+    if field.kind == FILE:
+        lines.append(f"    value = _load_file({default})")
+    else:
+        converter = f"_converter_{index}"
+        namespace[converter] = field.converter
+        lines.extend(
+            (
+                f"    value = {default}",
+                f"    dict_value = current.get({member!r})",
+                "    if dict_value:",
+                "        value = dict_value",
+                f"    if {env_key!r} in environ:",
+                f"        raw = environ[{env_key!r}]",
+                *_timed(
+                    [f"        value = _convert_env({converter}, {env_key!r}, raw)"],
+                    "env_coercion",
+                    traced=traced,
+                ),
+            ),
+        )
+
+    lines.extend(
+        (
+            "    if value is None:",
+            f"        raise _not_set(names, {member!r}, {env_key!r})",
+        ),
+    )
+
+    if strict and field.checker is not None:
+        checker = f"_checker_{index}"
+        origin = f"_origin_{index}"
+        namespace[checker] = field.checker
+        namespace[origin] = field.expected_origin
+        wrong_type = f"_wrong_type(names, {member!r}, {env_key!r}, value, {origin})"
+        lines.extend(
+            _timed(
+                [
+                    "    try:",
+                    f"        value = {checker}(value)",
+                    "    except TypeError:",
+                    f"        raise {wrong_type} from None",
+                ],
+                "strict_checks",
+                traced=traced,
+            ),
+        )
+
+    lines.append(assign)
+    return lines
+
+
+def make_loader(
+    fields: tuple[Field, ...],
+    env_prefix: str,
+    *,
+    strict: bool,
+    traced: bool = False,
+) -> Loader:
+    """Generate a straight-line loader for the given fields.
+
+    The loader does the same work as _Base._setup_field() for every field,
+    with the environment keys, defaults and expected types baked in as
+    constants, in the same spirit as the code dataclasses generates.
+
+    A traced loader runs the same code, and also records the timings and
+    counters _Base._setup_traced() records in the active LoadTrace.
+    """
+    namespace: dict[str, Any] = {
+        "_active_trace": active_trace,
+        "_clock": time.perf_counter,
+        "_copy": copy.copy,
+        "_convert_env": convert_env_value,
+        "_counting": CountingEnviron,
+        "_load_file": load_file,
+        "_not_set": _not_set,
+        "_wrong_type": _wrong_type,
+    }
+    lines = [
+        "def __voecfg_load__(self, current, prefixes, names, root_environ):",
+        "    environ = self._environ",
+    ]
+    if traced:
+        lines.extend(
+            (
+                "    trace = _active_trace()",
+                "    environ = _counting(environ, trace)",
+            ),
+        )
+
+    for index, field in enumerate(fields):
+        body = _field_lines(
+            field,
+            index,
+            env_prefix,
+            namespace,
+            strict=strict,
+            traced=traced,
+        )
+        if traced:
+            lines.extend(("    start = _clock()", *body, _record(field)))
+        else:
+            lines.extend(body)
+
+    exec("\n".join(lines), namespace)  # noqa: S102  # nosec B102
+    return namespace["__voecfg_load__"]
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+"""Parse only selected top-level keys of a TOML document.
+
+The document is scanned with a regular expression for its table
+headers, without building any objects. Only the selected tables are
+handed to the real parser. Anything the scanner doesn't understand
+falls back to parsing the whole document, so errors are reported by
+the parser as usual.
+
+JSON documents are not scanned: a scanner written in Python is slower
+than parsing the whole document with the json module.
+"""
+
+import mmap
+import re
+from collections.abc import Callable, Collection
+from typing import Any
+
+Buffer = bytes | mmap.mmap
+
+# Everything in a TOML document that can contain brackets that are not
+# table headers, plus the brackets and newlines themselves.
+_TOML_TOKEN = re.compile(
+    rb'"""[\s\S]*?"""(?!")'
+    rb"|'''[\s\S]*?'''(?!')"
+    rb'|"[^"\\\n]*(?:\\.[^"\\\n]*)*"'
+    rb"|'[^'\n]*'"
+    rb"|#[^\n]*"
+    rb"|[\[\]{}\n]",
+)
+_TOML_HEADER = re.compile(
+    rb"""\[\[?[ \t]*("[^"\\\n]*(?:\\.[^"\\\n]*)*"|'[^'\n]*'|[A-Za-z0-9_-]+)""",
+)
+
+
+def _toml_header_key(raw: bytes, loads: Callable[[bytes], Any]) -> str:
+    if raw.startswith(b"'"):
+        return raw[1:-1].decode("utf-8")
+    if raw.startswith(b'"'):
+        return loads(b"k = " + raw + b"\n")["k"]
+    return raw.decode("utf-8")
+
+
+def select_toml(
+    buf: Buffer,
+    keys: Collection[str],
+    loads: Callable[[bytes], Any],
+) -> Any:
+    """Parse only the tables under the given top-level keys of a TOML document.
+
+    Key/value pairs before the first table header are always parsed,
+    and filtered afterwards.
+    """
+    # (offset of the header line, whether to keep the table)
+    tables: list[tuple[int, bool]] = []
+    depth = 0
+    line_start = 0
+    for match in _TOML_TOKEN.finditer(buf):
+        token = match.group()
+        if token == b"\n":
+            line_start = match.end()
+        elif token in {b"[", b"{"}:
+            start = match.start()
+            if depth == 0 and token == b"[" and not buf[line_start:start].strip():
+                header = _TOML_HEADER.match(buf, start)
+                if header is None:
+                    return _select_all(buf, keys, loads)
+                key = _toml_header_key(header.group(1), loads)
+                tables.append((line_start, key in keys))
+            depth += 1
+        elif token in {b"]", b"}"}:
+            depth -= 1
+
+    offsets = [offset for offset, _ in tables]
+    parts = [buf[: offsets[0] if offsets else len(buf)]]
+    for index, (offset, keep) in enumerate(tables):
+        if keep:
+            end = offsets[index + 1] if index + 1 < len(offsets) else len(buf)
+            parts.append(buf[offset:end])
+
+    data = loads(b"\n".join(parts))
+    return {k: v for k, v in data.items() if k in keys}
+
+
+def _select_all(
+    buf: Buffer,
+    keys: Collection[str],
+    loads: Callable[[bytes], Any],
+) -> Any:
+    data = loads(bytes(buf))
+    return {k: v for k, v in data.items() if k in keys}
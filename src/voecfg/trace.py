@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+
+"""Timings and counters for config loads."""
+
+import time
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:  # pragma: no cover
+    from voecfg.schema import Field, Schema
+
+_active: ContextVar["LoadTrace | None"] = ContextVar("voecfg_trace", default=None)
+
+
+def active_trace() -> "LoadTrace | None":
+    """Return the trace of the load running in this context, if any."""
+    return _active.get()
+
+
+class LoadTrace:
+    """Where the time of one BaseConfig load went.
+
+    phases, in seconds:
+        schema: compiling the class schema, including _get_members()
+        config_file: loading _config_path
+        setup: _setup() for the whole tree
+        file_members: loading File members, part of setup
+        values: resolving plain values, part of setup
+        env_coercion: converting environment values, part of values
+        strict_checks: strict type checks, part of values and file_members
+        parse: parsing files that were not in the file cache
+
+    subconfigs: seconds spent in each SubConfig, by its path in the tree
+    files_read / bytes_parsed: files parsed, i.e. file cache misses
+    file_cache_hits: files served from the file cache
+    env_lookups: environment variables looked up
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.total = 0.0
+        self.phases: dict[str, float] = {}
+        self.subconfigs: dict[str, float] = {}
+        self.files_read = 0
+        self.bytes_parsed = 0
+        self.file_cache_hits = 0
+        self.env_lookups = 0
+        self._fields: dict[int, tuple[Schema, tuple[Field, ...]]] = {}
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.name} {self.total * 1e3:.3f} ms>"
+
+    @contextmanager
+    def activate(self) -> Iterator["LoadTrace"]:
+        """Collect into this trace, and time the whole block as the total."""
+        token = _active.set(self)
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.total += time.perf_counter() - start
+            _active.reset(token)
+
+    def add(self, phase: str, seconds: float) -> None:
+        """Add seconds to a phase."""
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a block as a phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def timed(self, phase: str, func: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        """Wrap func, so calls to it are timed as a phase."""
+
+        def _timed(value: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return func(value)
+            finally:
+                self.add(phase, time.perf_counter() - start)
+
+        return _timed
+
+    def fields(self, schema: "Schema") -> tuple["Field", ...]:
+        """Return copies of the schema's fields with timed conversions."""
+        cached = self._fields.get(id(schema))
+        if cached is not None:
+            return cached[1]
+
+        fields = tuple(
+            field.replace(
+                converter=self.timed("env_coercion", field.converter),
+                checker=(
+                    None
+                    if field.checker is None
+                    else self.timed("strict_checks", field.checker)
+                ),
+            )
+            for field in schema.fields
+        )
+        self._fields[id(schema)] = (schema, fields)
+        return fields
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the trace as a dict."""
+        return {
+            "name": self.name,
+            "total": self.total,
+            "phases": dict(self.phases),
+            "subconfigs": dict(self.subconfigs),
+            "files_read": self.files_read,
+            "bytes_parsed": self.bytes_parsed,
+            "file_cache_hits": self.file_cache_hits,
+            "env_lookups": self.env_lookups,
+        }
+
+
+def trace_phase(
+    trace: LoadTrace | None,
+    name: str,
+) -> AbstractContextManager[None]:
+    """Time a block as a phase of trace, or do nothing if trace is None."""
+    if trace is None:
+        return nullcontext()
+    return trace.phase(name)
+
+
+class CountingEnviron(Mapping[str, str]):
+    """Count the lookups made in an environment mapping."""
+
+    __slots__ = ("_environ", "_trace")
+
+    def __init__(self, environ: Mapping[str, str], trace: LoadTrace) -> None:
+        self._environ = environ
+        self._trace = trace
+
+    def __contains__(self, key: object) -> bool:
+        self._trace.env_lookups += 1
+        return key in self._environ
+
+    def __getitem__(self, key: str) -> str:
+        return self._environ[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._environ)
+
+    def __len__(self) -> int:
+        return len(self._environ)
@@ -2,10 +2,30 @@
 
 """Voecfg utils."""
 
-
 import json
 import os
-from typing import Any, get_origin
+import re
+import threading
+import types
+from collections.abc import Callable, Mapping
+from datetime import date, datetime, time, timedelta
+from enum import Enum
+from pathlib import PurePath
+from typing import Any, Literal, Union, get_args, get_origin
+
+Converter = Callable[[Any], Any]
+
+_UNION_TYPES: tuple[Any, ...] = (Union, types.UnionType)
+_COLLECTIONS = (list, tuple, set, frozenset)
+_NUMBERS: dict[Any, Converter] = {int: int, float: float}
+_ISO_PARSERS: dict[Any, Converter] = {
+    datetime: datetime.fromisoformat,
+    date: date.fromisoformat,
+    time: time.fromisoformat,
+}
+
+# Returned by _attempt() when the converter raised
+_NO_MATCH = object()
 
 
 def str_to_bool(val: str) -> bool:
@@ -15,26 +35,321 @@ def str_to_bool(val: str) -> bool:
     return val in {"true", "1", "yes", "y"}
 
 
-def load_from_environment(member_type: Any, env_key: str) -> Any:
-    """Load a value from the environment and coerce it to the expected type."""
-    env_value = os.environ[env_key]
+_TIMEDELTA = re.compile(
+    r"^(?P<sign>-)?(?:(?P<days>\d+) days?, )?"
+    r"(?P<hours>\d+):(?P<minutes>\d\d)(?::(?P<seconds>\d\d(?:\.\d+)?))?$",
+)
+
+
+def str_to_timedelta(val: str) -> timedelta:
+    """Parse seconds, or the [D day[s], ]H:MM[:SS[.ffffff]] format of str(timedelta)."""
+    try:
+        return timedelta(seconds=float(val))
+    except ValueError:
+        pass
+
+    match = _TIMEDELTA.match(val.strip())
+    if match is None:
+        msg = f"Invalid timedelta: {val!r}"
+        raise ValueError(msg)
+
+    delta = timedelta(
+        days=int(match["days"] or 0),
+        hours=int(match["hours"]),
+        minutes=int(match["minutes"]),
+        seconds=float(match["seconds"] or 0),
+    )
+    return -delta if match["sign"] else delta
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _enum_lookup(enum_cls: type[Enum]) -> Converter:
+    by_text: dict[str, Enum] = {}
+    for member in enum_cls:
+        by_text.setdefault(member.name, member)
+        by_text.setdefault(str(member.value), member)
+
+    def _convert(value: Any) -> Any:
+        if isinstance(value, enum_cls):
+            return value
+        try:
+            return enum_cls(value)
+        except ValueError:
+            pass
+        try:
+            return by_text[str(value)]
+        except KeyError:
+            msg = f"{value!r} is not a valid {enum_cls.__name__}"
+            raise ValueError(msg) from None
+
+    return _convert
+
+
+def _literal_lookup(hint: Any) -> Converter:
+    by_text = {str(arg): arg for arg in get_args(hint)}
+    allowed = set(by_text.values())
+
+    def _convert(value: Any) -> Any:
+        if value in allowed:
+            return value
+        try:
+            return by_text[str(value)]
+        except KeyError:
+            msg = f"{value!r} is not one of {sorted(by_text)}"
+            raise ValueError(msg) from None
+
+    return _convert
 
-    origin = get_origin(member_type) or member_type
+
+def _attempt(
+    converter: Converter,
+    value: Any,
+    errors: tuple[type[Exception], ...],
+) -> Any:
+    """Return converter(value), or _NO_MATCH if it raised one of errors."""
+    try:
+        return converter(value)
+    except errors:
+        return _NO_MATCH
+
+
+def _first_of(converters: list[Converter]) -> Converter:
+    def _convert(value: Any) -> Any:
+        for converter in converters:
+            result = _attempt(converter, value, (TypeError, ValueError))
+            if result is not _NO_MATCH:
+                return result
+        msg = f"{value!r} does not match any type in the union"
+        raise ValueError(msg)
+
+    return _convert
+
+
+def _build_value_converter(hint: Any) -> Converter:  # noqa: C901, PLR0911, PLR0912
+    """Build a converter from a str or a decoded JSON value to hint."""
+    origin = get_origin(hint) or hint
+    args = get_args(hint)
+
+    if origin is Any or origin is str or not isinstance(origin, type):
+        if origin is Literal:
+            return _literal_lookup(hint)
+        if origin in _UNION_TYPES:
+            arms = [get_value_converter(arg) for arg in args if arg is not type(None)]
+            return _first_of(arms)
+        return _identity
 
     if origin is bool:
-        return str_to_bool(env_value)
-    if origin is int:
-        return int(env_value)
-    if origin is float:
-        return float(env_value)
+        return lambda v: str_to_bool(v) if isinstance(v, str) else bool(v)
     if origin is bytes:
-        return env_value.encode("utf-8")
-    if origin in (list, dict):
+        return lambda v: v.encode("utf-8") if isinstance(v, str) else bytes(v)
+    if issubclass(origin, Enum):
+        return _enum_lookup(origin)
+    if issubclass(origin, PurePath):
+        return origin
+    if origin is timedelta:
+        return lambda v: v if isinstance(v, timedelta) else str_to_timedelta(str(v))
+    parse = _ISO_PARSERS.get(origin)
+    if parse is not None:
+        return lambda v: v if isinstance(v, origin) else parse(v)
+
+    if origin in _COLLECTIONS or origin is dict:
+        return _build_container_converter(origin, args)
+
+    number = _NUMBERS.get(origin)
+    if number is not None:
+        return lambda v: v if type(v) is origin else number(v)
+
+    return _identity
+
+
+def _build_container_converter(  # noqa: C901
+    origin: type,
+    args: tuple[Any, ...],
+) -> Converter:
+    def _decode(value: Any) -> Any:
+        return json.loads(value) if isinstance(value, (str, bytes)) else value
+
+    if origin is dict:
+        if not args:
+            return _decode
+        key = get_value_converter(args[0])
+        item = get_value_converter(args[1])
+
+        def _convert_dict(value: Any) -> Any:
+            return {key(k): item(v) for k, v in _decode(value).items()}
+
+        return _convert_dict
+
+    if origin is tuple and args and args[-1] is not Ellipsis:
+        items = [get_value_converter(arg) for arg in args]
+
+        def _convert_fixed(value: Any) -> Any:
+            values = _decode(value)
+            if len(values) != len(items):
+                msg = f"Expected {len(items)} items, got {len(values)}"
+                raise ValueError(msg)
+            return tuple(c(v) for c, v in zip(items, values, strict=True))
+
+        return _convert_fixed
+
+    if not args:
+        if origin is list:
+            return _decode
+        return lambda v: origin(_decode(v))
+
+    item = get_value_converter(args[0])
+
+    def _convert_items(value: Any) -> Any:
+        return origin(item(v) for v in _decode(value))
+
+    return _convert_items
+
+
+def _build_checker(hint: Any) -> Converter | None:  # noqa: PLR0911, C901
+    """Build a strict type check for values from defaults and config files."""
+    origin = get_origin(hint) or hint
+    args = get_args(hint)
+
+    if origin is Literal:
+        allowed = set(args)
+
+        def _check_literal(value: Any) -> Any:
+            if value not in allowed:
+                raise TypeError
+            return value
+
+        return _check_literal
+
+    if origin in _UNION_TYPES:
+        arms = [get_checker(arg) or _identity for arg in args]
+
+        def _check_union(value: Any) -> Any:
+            for arm in arms:
+                result = _attempt(arm, value, (TypeError,))
+                if result is not _NO_MATCH:
+                    return result
+            raise TypeError
+
+        return _check_union
+
+    if origin is type(None):
+        return _check_isinstance(origin)
+    if origin is Any or not isinstance(origin, type):
+        return None
+
+    # Types that config files can't represent natively are cast from
+    # their text (or list) form, everything else is only checked.
+    cast: Converter | None = None
+    if issubclass(origin, PurePath):
+        cast = origin
+    elif issubclass(origin, Enum) or origin in {datetime, date, time, timedelta}:
+        cast = get_value_converter(origin)
+    elif origin in {tuple, set, frozenset}:
+        cast = origin
+
+    if cast is None:
+        return _check_isinstance(origin)
+
+    def _check_cast(value: Any) -> Any:
+        if isinstance(value, origin):
+            return value
         try:
-            return json.loads(env_value)
-        except json.JSONDecodeError as e:
-            msg = f"Could not parse {env_key} as JSON: {e}"
-            raise ValueError(msg) from e
+            return cast(value)
+        except (TypeError, ValueError):
+            raise TypeError from None
+
+    return _check_cast
+
+
+def _check_isinstance(cls: type) -> Converter:
+    def _check(value: Any) -> Any:
+        if not isinstance(value, cls):
+            raise TypeError
+        return value
+
+    return _check
+
+
+_value_converters: dict[Any, Converter] = {}
+_converters: dict[Any, Converter] = {}
+_checkers: dict[Any, Converter | None] = {}
+_lock = threading.Lock()
+
+
+def _memoized(cache: dict[Any, Any], build: Callable[[Any], Any], hint: Any) -> Any:
+    try:
+        return cache[hint]
+    except KeyError:
+        pass
+    except TypeError:
+        # Unhashable hint, e.g. Annotated with unhashable metadata
+        return build(hint)
+
+    built = build(hint)
+    with _lock:
+        return cache.setdefault(hint, built)
+
+
+def get_value_converter(hint: Any) -> Converter:
+    """Return a cached converter from a str or decoded JSON value to hint."""
+    return _memoized(_value_converters, _build_value_converter, hint)
+
+
+def _build_env_converter(hint: Any) -> Converter:
+    origin = get_origin(hint) or hint
+    if origin is str or origin is Any or hint is None:
+        return _identity
+    if origin is bytes:
+        return lambda v: v.encode("utf-8")
+    if origin is int or origin is float:
+        return origin
+    if origin is bool:
+        return str_to_bool
+    return get_value_converter(hint)
+
+
+def get_converter(hint: Any) -> Converter:
+    """Return a cached converter from an environment variable value to hint.
+
+    Supports bool, int, float, str, bytes, Path, Enum, Literal, datetime,
+    date, time, timedelta, Optional/Union, and JSON encoded list, tuple,
+    set, frozenset and dict, with their items converted as well.
+    Other types are returned as strings.
+    """
+    return _memoized(_converters, _build_env_converter, hint)
+
+
+def get_checker(hint: Any) -> Converter | None:
+    """Return a cached strict type check for hint, or None if there is none.
+
+    The check returns the value, cast to the expected type where the
+    config file can't represent it natively (e.g. str to Path), and raises
+    TypeError if the value does not match.
+    """
+    return _memoized(_checkers, _build_checker, hint)
+
+
+def convert_env_value(converter: Converter, env_key: str, env_value: str) -> Any:
+    """Convert an environment variable value with a converter from get_converter."""
+    try:
+        return converter(env_value)
+    except json.JSONDecodeError as e:
+        msg = f"Could not parse {env_key} as JSON: {e}"
+        raise ValueError(msg) from e
+
+
+def load_from_environment(
+    member_type: Any,
+    env_key: str,
+    environ: Mapping[str, str] | None = None,
+) -> Any:
+    """Load a value from the environment and coerce it to the expected type.
+
+    Reads from environ if given, e.g. an Environ snapshot, else os.environ.
+    """
+    env_value = (os.environ if environ is None else environ)[env_key]
 
-    # Fallback: return as string
-    return env_value
+    return convert_env_value(get_converter(member_type), env_key, env_value)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+"""Reload configs when their files change."""
+
+import logging
+import threading
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from voecfg.base import BaseConfig, reload
+from voecfg.holder import ConfigHolder
+
+Watched = BaseConfig | ConfigHolder[Any]
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigWatcher:
+    """Poll the files a config is loaded from, and reload it when they change.
+
+    The watched files are _config_path and every File member in the
+    config tree. Changes are detected with File.stamp(), which is a stat()
+    for regular files.
+
+    The config can also be a ConfigHolder, which then publishes every
+    reload as a new generation.
+
+    Use check() to poll once, or start() to poll from a daemon thread.
+    """
+
+    def __init__(
+        self,
+        config: Watched,
+        interval: float = 1.0,
+        on_reload: Callable[[Watched], None] | None = None,
+    ) -> None:
+        self.config = config
+        self.interval = interval
+        self.on_reload = on_reload
+        self._files = config._watched_files()  # noqa: SLF001
+        self._stamps = self._current_stamps()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _current_stamps(self) -> list[Hashable]:
+        return [file.stamp() for file in self._files]
+
+    def check(self) -> bool:
+        """Reload the config if any of its files changed.
+
+        Returns True if the config was reloaded with new values.
+        """
+        stamps = self._current_stamps()
+        if stamps == self._stamps:
+            return False
+
+        self._stamps = stamps
+        config = self.config
+        if isinstance(config, ConfigHolder):
+            reloaded = config.reload()
+        else:
+            reloaded = reload(config)
+        if not reloaded:
+            return False
+
+        if self.on_reload is not None:
+            self.on_reload(self.config)
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._check_logged()
+
+    def _check_logged(self) -> None:
+        """Run check(), and log errors instead of ending the thread."""
+        try:
+            self.check()
+        except Exception:
+            # Keep the old values, and try again when the files change
+            name = type(self.config).__name__
+            logger.exception("Reloading %s failed", name)
+
+    def start(self) -> None:
+        """Start polling in a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="voecfg-watcher",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the polling thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -1,4 +1,23 @@
 #!/usr/bin/env python3
 
+import json
+import os
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
 import dotenv  # noqa: F401
+import pytest
 import toml  # noqa: F401
+
+
+@pytest.fixture
+def write_json() -> Callable[[Path, Any, int], None]:
+    """Return a function that writes data to a JSON file with the mtime given."""
+
+    def write(path: Path, data: Any, mtime: int) -> None:
+        path.write_text(json.dumps(data))
+        # Make sure the stat identity changes, even on coarse filesystems
+        os.utime(path, ns=(mtime, mtime))
+
+    return write
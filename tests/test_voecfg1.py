@@ -5,10 +5,10 @@ from pathlib import Path
 from typing import Any
 
 import pytest
-import toml
 from dotenv import load_dotenv
 
-from voecfg import BaseConfig, File, SubConfig, json_file, toml_file
+from voecfg import BaseConfig, Environ, File, SubConfig, json_file, toml_file
+from voecfg.file import TOML_PARSER
 
 load_dotenv((Path(__file__).parent / "voecfg_data" / "env").resolve())
 _voecfg__data = Path(__file__).parent / "voecfg_data"
@@ -227,7 +227,8 @@ def test_load_toml_invalid() -> None:
         _prefix = "voecfg"
         devices: dict[str, Any] = toml_file(_voecfg__data / "load_toml_invalid.toml")
 
-    with pytest.raises(toml.decoder.TomlDecodeError):
+    assert TOML_PARSER is not None
+    with pytest.raises(TOML_PARSER.error):
         voecfgTestConfig()
 
 
@@ -325,3 +326,228 @@ def test_wrong_type() -> None:
         match="is <class 'str'>, expected <class 'int'>",
     ):
         voecfgTestConfig()
+
+
+def test_schema_compiled_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    class FlaskConfig(SubConfig):
+        _prefix = "sub"
+        var_int: int
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg"
+        flask = FlaskConfig()
+        env1: str
+
+    calls: list[str] = []
+    get_members = SubConfig._get_members  # noqa: SLF001
+
+    def counting_get_members(self: Any) -> Any:
+        calls.append(self.__class__.__name__)
+        return get_members(self)
+
+    monkeypatch.setattr(SubConfig, "_get_members", counting_get_members)
+    monkeypatch.setattr(BaseConfig, "_get_members", counting_get_members)
+
+    config1 = voecfgTestConfig()
+    config2 = voecfgTestConfig()
+    assert calls == ["voecfgTestConfig"]
+    assert config1.env1 == config2.env1 == "959"
+
+
+def test_subconfig_not_shared() -> None:
+    class FlaskConfig(SubConfig):
+        _prefix = "sub"
+        var_int: int
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg"
+        flask = FlaskConfig()
+
+    config1 = voecfgTestConfig()
+    config2 = voecfgTestConfig()
+    config1.flask.var_int = 2
+    assert config1.flask is not config2.flask
+    assert config2.flask.var_int == 1
+
+
+def test_class_value_changed(monkeypatch: pytest.MonkeyPatch) -> None:
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_changed"
+        port: int = 1
+
+    class voecfgChildConfig(voecfgTestConfig):
+        host: str = "a"
+
+    assert voecfgTestConfig().port == voecfgChildConfig().port == 1
+
+    # The compiled schemas don't keep the old defaults
+    voecfgTestConfig.port = 2
+    assert voecfgTestConfig().port == voecfgChildConfig().port == 2  # noqa: PLR2004
+
+    monkeypatch.setattr(voecfgChildConfig, "host", "b")
+    assert voecfgChildConfig().host == "b"
+    monkeypatch.undo()
+    assert voecfgChildConfig().host == "a"
+    assert voecfgChildConfig().port == 2  # noqa: PLR2004
+
+
+def test_compiled_loader() -> None:
+    class FlaskConfig(SubConfig):
+        _prefix = "sub"
+        _compiled = True
+        var_int: int
+        var_str: str
+        var_bool: bool
+        var_list: list[int]
+        var_str_to_path: Path
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg"
+        _compiled = True
+        _config_path = json_file(_voecfg__data / "config.json")
+        flask = FlaskConfig()
+        env1 = "911"
+        value3: str = "P1"
+        devices: dict[str, Any] = json_file(_voecfg__data / "load_json.json")
+
+        def ignore_me(self) -> int:
+            return 1
+
+    config = voecfgTestConfig()
+    assert config.flask.var_int == 1
+    assert config.flask.var_str == "blah"
+    assert config.flask.var_bool is True
+    assert config.flask.var_list == [1, 2, 3]
+    assert config.flask.var_str_to_path == Path("/tmp/some_file.txt")
+    assert config.env1 == "959"
+    assert config.value3 == "F1"
+    assert config.devices["a"] == 1
+    assert config.ignore_me() == 1
+    assert voecfgTestConfig().as_dict() == config.as_dict()
+
+
+def test_compiled_loader_errors() -> None:
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg"
+        _compiled = True
+        var_int_missing: int
+
+    with pytest.raises(
+        ValueError,
+        match="voecfgTestConfig.var_int_missing / VOECFG_VAR_INT_MISSING not set.",
+    ):
+        voecfgTestConfig()
+
+    class voecfgTestConfig2(BaseConfig):
+        _prefix = "voecfg"
+        _compiled = True
+        some_str_we_pretend_is_int: int = 1
+        _config_path = json_file(_voecfg__data / "config.json")
+
+    with pytest.raises(
+        TypeError,
+        match="is <class 'str'>, expected <class 'int'>",
+    ):
+        voecfgTestConfig2()
+
+
+def test_lazy_fields() -> None:
+    loads: list[str] = []
+
+    class CountingFile(File):
+        def load(self) -> Any:
+            loads.append(str(self.path))
+            return {"a": 1}
+
+    devices_file: Any = CountingFile("devices")
+
+    class FlaskConfig(SubConfig):
+        _prefix = "sub"
+        _lazy = True
+        var_int: int
+        var_missing: int
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg"
+        _lazy = True
+        flask = FlaskConfig()
+        devices: dict[str, Any] = devices_file
+        var_int_missing: int
+        env1 = "911"
+
+    config = voecfgTestConfig()
+    assert loads == []
+    assert "flask" not in config.__dict__
+
+    assert config.env1 == "959"
+    assert config.flask.var_int == 1
+    assert config.devices == {"a": 1}
+    assert config.devices is config.devices
+    assert loads == ["devices"]
+
+    with pytest.raises(
+        ValueError,
+        match="voecfgTestConfig.FlaskConfig.var_missing / VOECFG_SUB_VAR_MISSING",
+    ):
+        _ = config.flask.var_missing
+
+    with pytest.raises(ValueError, match="VOECFG_VAR_INT_MISSING not set"):
+        _ = config.var_int_missing
+
+    assert voecfgTestConfig.env1 == "911"
+
+
+def test_environ_snapshot(monkeypatch: pytest.MonkeyPatch) -> None:
+    class FlaskConfig(SubConfig):
+        _prefix = "sub"
+        var_int: int
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg"
+        flask = FlaskConfig()
+        env1: str
+
+    class voecfgTestConfig2(BaseConfig):
+        _prefix = "voecfg"
+        _compiled = True
+        flask = FlaskConfig()
+        env1: str
+
+    snapshot = Environ()
+    monkeypatch.setenv("VOECFG_ENV1", "changed")
+    assert voecfgTestConfig(environ=snapshot).env1 == "959"
+    assert voecfgTestConfig2(environ=snapshot).flask.var_int == 1
+    assert voecfgTestConfig().env1 == "changed"
+
+    assert set(snapshot.scope("VOECFG_SUB")) <= set(snapshot.scope("VOECFG"))
+    assert snapshot.scope("VOECFG_SUB")["VOECFG_SUB_VAR_INT"] == "1"
+
+    config = voecfgTestConfig(environ={"VOECFG_ENV1": "a", "VOECFG_SUB_VAR_INT": "2"})
+    assert config.env1 == "a"
+    assert config.flask.var_int == 2
+
+
+def test_field_names_like_functions() -> None:
+    # The operations on configs are functions, so any name is a field
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_names"
+        check: bool = False
+        reload: bool = False
+        load_trace: str = "off"
+        snapshot: int = 1
+        aload: bool = False
+        freeze: bool = False
+        dump_json: str = "compact"
+        overlay: str = "none"
+        subscribe: bool = True
+
+    config = voecfgTestConfig(environ={"VOECFG_NAMES_CHECK": "1"})
+    assert config.check is True
+    assert config.reload is False
+    assert config.load_trace == "off"
+    assert config.snapshot == 1
+    assert config.aload is False
+    assert config.freeze is False
+    assert config.dump_json == "compact"
+    assert config.overlay == "none"
+    assert config.subscribe is True
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from voecfg import BaseConfig, File, SubConfig, aload, json_file
+
+# ruff: noqa: N801
+
+
+class _BarrierFile(File):
+    """A file that can only be loaded while the other one is being loaded."""
+
+    def __init__(self, path: Path, barrier: threading.Barrier) -> None:
+        super().__init__(path)
+        self.barrier = barrier
+        self.loads = 0
+
+    def load(self) -> Any:
+        self.loads += 1
+        self.barrier.wait()
+        return json.loads(Path(self.path).read_text())
+
+
+def test_aload(tmp_path: Path) -> None:
+    config_file = tmp_path / "config.json"
+    config_file.write_text(
+        json.dumps({"voecfg_async": {"name": "one", "db": {"port": 1}}}),
+    )
+    (tmp_path / "a.json").write_text('{"a": 1}')
+    (tmp_path / "b.json").write_text('{"b": 2}')
+
+    # Both files have to be read at the same time
+    barrier = threading.Barrier(2, timeout=5)
+    a_file: Any = _BarrierFile(tmp_path / "a.json", barrier)
+    b_file: Any = _BarrierFile(tmp_path / "b.json", barrier)
+
+    class DBConfig(SubConfig):
+        _prefix = "db"
+        port: int
+        b: dict[str, int] = b_file
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_async"
+        _config_path = json_file(config_file)
+        name: str
+        a: dict[str, int] = a_file
+        db = DBConfig()
+
+    config = asyncio.run(aload(voecfgTestConfig))
+    assert isinstance(config, voecfgTestConfig)
+    assert config.name == "one"
+    assert config.a == {"a": 1}
+    assert config.db.b == {"b": 2}
+    assert config.db.port == 1
+    assert (a_file.loads, b_file.loads) == (1, 1)
+
+
+def test_aload_executor(tmp_path: Path) -> None:
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({"voecfg_async": {"name": "one"}}))
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_async"
+        _config_path = json_file(config_file)
+        _compiled = True
+        name: str
+        workers: int = 1
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        config = asyncio.run(
+            aload(
+                voecfgTestConfig,
+                environ={"VOECFG_ASYNC_WORKERS": "4"},
+                executor=executor,
+            ),
+        )
+    assert config.as_dict() == {"voecfg_async": {"name": "one", "workers": 4}}
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from voecfg import (
+    BaseConfig,
+    Change,
+    ConfigHolder,
+    SubConfig,
+    from_snapshot,
+    json_file,
+    overlay,
+    reload,
+    snapshot,
+    subscribe,
+)
+
+# ruff: noqa: N801
+
+
+WriteJSON = Callable[[Path, Any, int], None]
+
+
+class DBConfig(SubConfig):
+    _prefix = "db"
+    host: str = "localhost"
+    port: int
+
+
+class QueueConfig(SubConfig):
+    _prefix = "queue"
+    size: int
+
+
+@pytest.fixture
+def files(tmp_path: Path, write_json: WriteJSON) -> tuple[Path, Path]:
+    config_file = tmp_path / "config.json"
+    devices_file = tmp_path / "devices.json"
+    write_json(
+        config_file,
+        {"voecfg_changes": {"name": "one", "db": {"port": 1}, "queue": {"size": 1}}},
+        1,
+    )
+    write_json(devices_file, {"a": 1}, 1)
+    return config_file, devices_file
+
+
+def test_subscribe(files: tuple[Path, Path], write_json: WriteJSON) -> None:
+    config_file, devices_file = files
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_changes"
+        _config_path = json_file(config_file)
+        name: str
+        db = DBConfig()
+        queue = QueueConfig()
+        devices: dict[str, Any] = json_file(devices_file)
+
+    config = voecfgTestConfig()
+    seen: dict[str, list[list[Change]]] = {"": [], "db": [], "db.port": [], "queue": []}
+    unsubscribe = {
+        path: subscribe(config, path, seen[path].append) for path in list(seen)
+    }
+
+    write_json(
+        config_file,
+        {"voecfg_changes": {"name": "one", "db": {"port": 2}, "queue": {"size": 1}}},
+        2,
+    )
+    assert reload(config) is True
+    assert seen[""] == [[Change("db.port", 1, 2)]]
+    assert seen["db"] == [[Change("db.port", 1, 2)]]
+    assert seen["db.port"] == [[Change("db.port", 1, 2)]]
+    assert seen["queue"] == []
+
+    # Only the devices file changed, so only that subtree is compared
+    unsubscribe["db"]()
+    write_json(devices_file, {"a": 2}, 2)
+    assert reload(config) is True
+    assert seen[""][-1] == [Change("devices", {"a": 1}, {"a": 2})]
+    assert len(seen["db"]) == 1
+    assert len(seen["db.port"]) == 1
+
+
+def test_subscribe_unknown_path(files: tuple[Path, Path]) -> None:
+    config_file, devices_file = files
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_changes"
+        _config_path = json_file(config_file)
+        name: str
+        db = DBConfig()
+        queue = QueueConfig()
+        devices: dict[str, Any] = json_file(devices_file)
+
+    config = voecfgTestConfig()
+    for path in ("missing", "db.missing", "name.upper"):
+        with pytest.raises(KeyError, match=path):
+            subscribe(config, path, print)
+
+
+def test_subscribers_not_copied(files: tuple[Path, Path]) -> None:
+    config_file, devices_file = files
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_changes"
+        _config_path = json_file(config_file)
+        name: str
+        db = DBConfig()
+        queue = QueueConfig()
+        devices: dict[str, Any] = json_file(devices_file)
+
+    config = voecfgTestConfig()
+    seen: list[list[Change]] = []
+    subscribe(config, "", seen.append)
+
+    derived = overlay(config, {"name": "two"})
+    assert "_subscribers" not in derived.__dict__
+    restored = from_snapshot(voecfgTestConfig, snapshot(config))
+    assert restored.__dict__.get("_subscribers") is None
+
+
+def test_holder_subscribe(files: tuple[Path, Path], write_json: WriteJSON) -> None:
+    config_file, devices_file = files
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_changes"
+        _config_path = json_file(config_file)
+        name: str
+        db = DBConfig()
+        queue = QueueConfig()
+        devices: dict[str, Any] = json_file(devices_file)
+
+    holder = ConfigHolder(voecfgTestConfig)
+    seen: list[tuple[list[Change], int]] = []
+    holder.subscribe("db", lambda changes: seen.append((changes, holder.generation)))
+
+    write_json(
+        config_file,
+        {"voecfg_changes": {"name": "two", "db": {"port": 2}, "queue": {"size": 1}}},
+        2,
+    )
+    assert holder.reload() is True
+    # Called after the new generation was published
+    assert seen == [([Change("db.port", 1, 2)], 2)]
+
+    holder.publish(overlay(holder.current, {"db": {"host": "db"}}))
+    assert seen[-1] == ([Change("db.host", "localhost", "db")], 3)
+
+    holder.publish(overlay(holder.current, {"name": "three"}))
+    assert len(seen) == 2  # noqa: PLR2004
+
+    with pytest.raises(KeyError):
+        holder.subscribe("db.missing", print)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+
+import json
+from pathlib import Path
+
+import pytest
+
+import voecfg
+from voecfg import BaseConfig, SubConfig
+from voecfg.cli import _split, check, import_config, main
+
+# ruff: noqa: N801
+
+
+class voecfgCheckDB(SubConfig):
+    _prefix = "db"
+    _lazy = True
+    host: str
+    port: int
+
+
+class voecfgCheckConfig(BaseConfig):
+    _prefix = "voecfg_check"
+    name: str
+    workers: int = 1
+    db = voecfgCheckDB()
+
+
+class voecfgCheckOther(BaseConfig):
+    _prefix = "voecfg_other"
+    debug: bool = False
+
+
+def test_check_collects_errors() -> None:
+    errors = voecfg.check(voecfgCheckConfig, environ={"VOECFG_CHECK_WORKERS": "x"})
+    messages = "\n".join(str(e) for e in errors)
+    assert len(errors) == 4
+    assert "VOECFG_CHECK_NAME not set" in messages
+    assert "invalid literal for int()" in messages
+    assert "VOECFG_CHECK_DB_HOST not set" in messages
+    assert "VOECFG_CHECK_DB_PORT not set" in messages
+
+    assert (
+        voecfg.check(
+            voecfgCheckConfig,
+            environ={
+                "VOECFG_CHECK_NAME": "one",
+                "VOECFG_CHECK_DB_HOST": "db",
+                "VOECFG_CHECK_DB_PORT": "1",
+            },
+        )
+        == []
+    )
+
+
+def test_import_config() -> None:
+    assert import_config("test_voecfg_cli:voecfgCheckConfig") is voecfgCheckConfig
+    assert import_config("test_voecfg_cli.voecfgCheckOther") is voecfgCheckOther
+
+    with pytest.raises(TypeError, match="not a BaseConfig subclass"):
+        import_config("test_voecfg_cli:voecfgCheckDB")
+    with pytest.raises(ValueError, match="Not an import path"):
+        import_config("nope")
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_check(tmp_path: Path, jobs: int) -> None:
+    envs = tmp_path / "envs"
+    envs.mkdir()
+    (envs / "prod.env").write_text(
+        "VOECFG_CHECK_NAME=prod\nVOECFG_CHECK_DB_HOST=db\nVOECFG_CHECK_DB_PORT=1\n",
+    )
+    (envs / "dev.env").write_text("VOECFG_CHECK_NAME=dev\nVOECFG_OTHER_DEBUG=1\n")
+    (envs / "README").write_text("not an env file")
+
+    report = check(
+        [
+            "test_voecfg_cli:voecfgCheckConfig",
+            "test_voecfg_cli:voecfgCheckOther",
+            "test_voecfg_cli:nope",
+        ],
+        [str(envs / "dev.env"), str(envs / "prod.env")],
+        jobs=jobs,
+    )
+    assert report["checked"] == 6
+    assert report["failed"] == 3
+
+    results = {
+        (r["config"].partition(":")[2], Path(r["env"]).stem): r
+        for r in report["results"]
+    }
+    assert results["voecfgCheckConfig", "prod"]["ok"]
+    assert [e["type"] for e in results["voecfgCheckConfig", "dev"]["errors"]] == [
+        "ValueError",
+        "ValueError",
+    ]
+    assert results["voecfgCheckOther", "dev"]["ok"]
+    assert results["nope", "dev"]["errors"][0]["type"] == "AttributeError"
+
+
+def test_split() -> None:
+    envs = ["a", "b", "c", "d", "e"]
+    assert _split(["one"], envs, 1) == [("one", envs)]
+    assert _split(["one"], envs, 2) == [("one", envs[:3]), ("one", envs[3:])]
+    assert _split(["one", "two"], envs, 4) == [
+        ("one", envs[:3]),
+        ("one", envs[3:]),
+        ("two", envs[:3]),
+        ("two", envs[3:]),
+    ]
+    assert _split(["one", "two", "three"], envs, 2) == [
+        ("one", envs),
+        ("two", envs),
+        ("three", envs),
+    ]
+    assert _split(["one"], ["a"], 8) == [("one", ["a"])]
+    assert _split(["one"], [], 8) == []
+
+
+def test_check_one_config(tmp_path: Path) -> None:
+    envs = []
+    for name in ("a", "b", "c"):
+        env = tmp_path / f"{name}.env"
+        env.write_text(f"VOECFG_CHECK_NAME={name}\n")
+        envs.append(str(env))
+
+    report = check(["test_voecfg_cli:voecfgCheckOther"], envs, jobs=2)
+    assert [r["env"] for r in report["results"]] == envs
+    assert report["failed"] == 0
+
+    # Unlike an _env_file, a missing env file to check is an error
+    report = check(["test_voecfg_cli:voecfgCheckOther"], [str(tmp_path / "x.env")])
+    assert report["results"][0]["errors"][0]["type"] == "FileNotFoundError"
+
+
+def test_main(
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    (tmp_path / ".env").write_text("VOECFG_OTHER_DEBUG=true\n")
+
+    assert main(["check", "test_voecfg_cli:voecfgCheckOther", "-e", str(tmp_path)]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["checked"] == 1
+    assert report["results"][0]["env"] == str(tmp_path / ".env")
+
+    assert main(["check", "test_voecfg_cli:voecfgCheckConfig", "-j", "1"]) == 1
+    assert json.loads(capsys.readouterr().out)["failed"] == 1
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+import os
+from pathlib import Path
+
+import pytest
+
+from voecfg import BaseConfig, SubConfig, read_dotenv
+from voecfg.environ import parse_dotenv
+
+# ruff: noqa: N801
+
+
+def test_parse_dotenv() -> None:
+    text = (
+        "# comment\n"
+        "\n"
+        "export A=1\n"
+        "B = 'two words \\n'\n"
+        'C="x # y\\n\\"z\\""\n'
+        "D=value # comment\n"
+        "E=\n"
+        "broken\n"
+    )
+    assert parse_dotenv(text) == {
+        "A": "1",
+        "B": "two words \\n",
+        "C": 'x # y\n"z"',
+        "D": "value",
+        "E": "",
+    }
+
+
+def test_read_dotenv(tmp_path: Path) -> None:
+    env = tmp_path / ".env"
+    env.write_text("APP_A=1\nAPP_DB_HOST=db\nOTHER=x\n")
+
+    values = read_dotenv(env)
+    assert values == {"APP_A": "1", "APP_DB_HOST": "db", "OTHER": "x"}
+    assert read_dotenv(env) is values
+    assert read_dotenv(env, "APP") == {"APP_A": "1", "APP_DB_HOST": "db"}
+    assert read_dotenv(env, "APP") is read_dotenv(env, "APP")
+
+    env.write_text("APP_A=2\n")
+    os.utime(env, ns=(1, 1))
+    assert read_dotenv(env, "APP") == {"APP_A": "2"}
+
+    env.unlink()
+    assert read_dotenv(env) == {}
+    assert read_dotenv(tmp_path / "missing.env", "APP") == {}
+
+
+def test_env_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    env = tmp_path / ".env"
+    env.write_text(
+        "VOECFG_DOTENV_NAME=dotenv\nVOECFG_DOTENV_DB_PORT=5432\nVOECFG_DOTENV_X=1\n",
+    )
+    monkeypatch.setenv("VOECFG_DOTENV_NAME", "environ")
+
+    class DBConfig(SubConfig):
+        _prefix = "db"
+        port: int
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_dotenv"
+        _env_file = env
+        name: str
+        db = DBConfig()
+
+    config = voecfgTestConfig()
+    assert config.name == "environ"
+    assert config.db.port == 5432
+    assert "VOECFG_DOTENV_DB_PORT" not in os.environ
+
+    config = voecfgTestConfig(environ={})
+    assert config.name == "dotenv"
+
+    # A missing .env file is ignored
+    env.unlink()
+    monkeypatch.setenv("VOECFG_DOTENV_DB_PORT", "1")
+    config = voecfgTestConfig()
+    assert config.name == "environ"
+    with pytest.raises(ValueError, match="VOECFG_DOTENV_DB_PORT not set"):
+        voecfgTestConfig(environ={})
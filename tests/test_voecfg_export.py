@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+
+import io
+import json
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from voecfg import (
+    BaseConfig,
+    SubConfig,
+    dump_json,
+    dump_toml,
+    iter_items,
+    json_file,
+    reload,
+)
+from voecfg.export import is_secret
+from voecfg.file import TOML_PARSER
+
+# ruff: noqa: N801
+
+
+class Color(Enum):
+    RED = "red"
+
+
+@pytest.fixture
+def config_file(tmp_path: Path) -> Path:
+    path = tmp_path / "config.json"
+    path.write_text(
+        json.dumps(
+            {
+                "voecfg_export": {
+                    "name": "one",
+                    "db": {"port": 1, "password": "hunter2", "dsn": "x"},
+                },
+            },
+        ),
+    )
+    return path
+
+
+def test_iter_items(config_file: Path) -> None:
+    class DBConfig(SubConfig):
+        _prefix = "db"
+        _secrets = ("dsn",)
+        port: int
+        password: str
+        dsn: str
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_export"
+        _config_path = json_file(config_file)
+        name: str
+        db = DBConfig()
+
+    config = voecfgTestConfig()
+
+    items = dict(iter_items(config))
+    assert list(items) == sorted(items)
+    assert items["voecfg_export", "name"] == "one"
+    assert items["voecfg_export", "db", "port"] == 1
+    assert items["voecfg_export", "db", "password"] == "**********"
+    assert items["voecfg_export", "db", "dsn"] == "**********"
+
+    items = dict(iter_items(config.db, redact=False))
+    assert items["password",] == "hunter2"
+    assert items["dsn",] == "x"
+
+
+def test_dump_json(config_file: Path) -> None:
+    class DBConfig(SubConfig):
+        _prefix = "db"
+        _secrets = ("dsn",)
+        port: int
+        password: str
+        dsn: str
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_export"
+        _config_path = json_file(config_file)
+        name: str
+        path: Path = Path("/srv")
+        key: bytes = b"\x00\x01"
+        color: Color = Color.RED
+        tags: set[str] = {"b", "a"}  # noqa: RUF012
+        limits: dict[str, Any] = {"cpu": 2, "mem": None}  # noqa: RUF012
+        db = DBConfig()
+
+    config = voecfgTestConfig()
+
+    data = json.loads(dump_json(config))
+    assert data == {
+        "voecfg_export": {
+            "color": "red",
+            "db": {"dsn": "**********", "password": "**********", "port": 1},
+            "key": "AAE=",
+            "limits": {"cpu": 2, "mem": None},
+            "name": "one",
+            "path": str(Path("/srv")),
+            "tags": ["a", "b"],
+        },
+    }
+
+    fp = io.StringIO()
+    assert dump_json(config, fp) is None
+    assert json.loads(fp.getvalue()) == data
+
+    unredacted = json.loads(dump_json(config, redact=False))
+    assert unredacted["voecfg_export"]["db"]["password"] == "hunter2"
+
+
+def test_dump_toml(config_file: Path) -> None:
+    assert TOML_PARSER is not None
+
+    class DBConfig(SubConfig):
+        _prefix = "db"
+        _secrets = ("dsn",)
+        port: int
+        password: str
+        dsn: str
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_export"
+        _config_path = json_file(config_file)
+        name: str
+        path: Path = Path("/srv")
+        key: bytes = b"\x00\x01"
+        color: Color = Color.RED
+        tags: set[str] = {"b", "a"}  # noqa: RUF012
+        limits: dict[str, Any] = {"cpu": 2, "mem": None}  # noqa: RUF012
+        db = DBConfig()
+
+    config = voecfgTestConfig()
+    text = dump_toml(config)
+    assert text.startswith("[voecfg_export]\n")
+
+    data = TOML_PARSER.loads(text.encode("utf-8"))
+    assert data == {
+        "voecfg_export": {
+            "color": "red",
+            "db": {"dsn": "**********", "password": "**********", "port": 1},
+            "key": "AAE=",
+            "limits": {"cpu": 2},
+            "name": "one",
+            "path": str(Path("/srv")),
+            "tags": ["a", "b"],
+        },
+    }
+
+    fp = io.StringIO()
+    dump_toml(config.db, fp, redact=False)
+    assert TOML_PARSER.loads(fp.getvalue().encode("utf-8")) == {
+        "dsn": "x",
+        "password": "hunter2",
+        "port": 1,
+    }
+
+
+def test_dump_cached(config_file: Path) -> None:
+    class DBConfig(SubConfig):
+        _prefix = "db"
+        _secrets = ("dsn",)
+        port: int
+        password: str
+        dsn: str
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_export"
+        _config_path = json_file(config_file)
+        name: str
+        db = DBConfig()
+
+    config = voecfgTestConfig()
+
+    first = dump_json(config)
+    assert dump_json(config) is first
+
+    # Replacing a value, also in a SubConfig, invalidates the export
+    config.db.port = 2
+    second = dump_json(config)
+    assert second is not first
+    assert json.loads(second)["voecfg_export"]["db"]["port"] == 2
+
+    config_file.write_text(
+        json.dumps(
+            {
+                "voecfg_export": {
+                    "name": "two",
+                    "db": {"port": 2, "password": "x", "dsn": "y"},
+                },
+            },
+        ),
+    )
+    assert reload(config)
+    assert json.loads(dump_json(config))["voecfg_export"]["name"] == "two"
+
+
+def test_is_secret() -> None:
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_export"
+        _secrets = ("dsn",)
+
+    config = voecfgTestConfig()
+    for member in ("dsn", "password", "db_passwd", "auth_token", "API_KEY"):
+        assert is_secret(config, member), member
+    for member in ("max_tokens", "tokenizer", "secrets_dir", "passwords_url"):
+        assert not is_secret(config, member), member
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from voecfg import (
+    BaseConfig,
+    File,
+    Parser,
+    file_cache,
+    json_file,
+    layered_file,
+    register_file_type,
+    reload,
+    toml_file,
+)
+from voecfg.file import (
+    JSON_PARSER,
+    TOML_PARSER,
+    FileCache,
+    JSONFile,
+    TOMLFile,
+    default_json_parser,
+    file_type_for_content_type,
+    file_type_for_path,
+)
+from voecfg.subtree import select_toml
+
+# ruff: noqa: N801
+
+
+@pytest.fixture
+def config_file(tmp_path: Path) -> Path:
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"voecfg_cache": {"name": "one", "items": [1]}}))
+    return path
+
+
+def test_file_cache_hits(config_file: Path) -> None:
+    cache = FileCache()
+
+    first = cache.load(config_file, "json", json.loads)
+    second = cache.load(config_file, "json", json.loads)
+    assert first == second
+    assert cache.info() == (1, 1, 128, 1)
+
+
+def test_file_cache_copy_on_read(config_file: Path) -> None:
+    cache = FileCache()
+
+    data = cache.load(config_file, "json", json.loads)
+    data["voecfg_cache"]["items"].append(2)
+    assert cache.load(config_file, "json", json.loads)["voecfg_cache"]["items"] == [1]
+
+
+def test_file_cache_stat_change(config_file: Path) -> None:
+    cache = FileCache()
+
+    cache.load(config_file, "json", json.loads)
+    config_file.write_text(json.dumps({"voecfg_cache": {"name": "two!"}}))
+    data = cache.load(config_file, "json", json.loads)
+    assert data["voecfg_cache"]["name"] == "two!"
+    assert cache.info().misses == 2
+
+
+def test_file_cache_invalidate_and_evict(tmp_path: Path, config_file: Path) -> None:
+    cache = FileCache(maxsize=1)
+
+    cache.load(config_file, "json", json.loads)
+    cache.invalidate(config_file)
+    assert cache.info().currsize == 0
+
+    other = tmp_path / "other.json"
+    other.write_text("{}")
+    cache.load(config_file, "json", json.loads)
+    cache.load(other, "json", json.loads)
+    assert cache.info().currsize == 1
+    cache.load(config_file, "json", json.loads)
+    assert cache.info().misses == 4
+
+    cache.invalidate()
+    assert cache.info().currsize == 0
+
+
+def test_file_cache_disk(tmp_path: Path, config_file: Path) -> None:
+    cache_dir = tmp_path / "cache"
+    parsed: list[bytes] = []
+
+    def parse(data: Any) -> Any:
+        parsed.append(bytes(data))
+        return json.loads(data)
+
+    first = FileCache(cache_dir=cache_dir).load(config_file, "json", parse)
+    assert len(parsed) == 1
+
+    # A new process, or cache, reads the parsed file from disk
+    cache = FileCache(cache_dir=cache_dir)
+    assert cache.load(config_file, "json", parse) == first
+    assert len(parsed) == 1
+    assert cache.disk_hits == 1
+
+    # Other parsers have their own entries
+    FileCache(cache_dir=cache_dir).load(config_file, "json/2", parse)
+    assert len(parsed) == 2
+
+    config_file.write_text(json.dumps({"voecfg_cache": {"name": "two!"}}))
+    data = FileCache(cache_dir=cache_dir).load(config_file, "json", parse)
+    assert data["voecfg_cache"]["name"] == "two!"
+    assert len(parsed) == 3
+
+    # Corrupt entries are parsed again, and replaced
+    for entry in cache_dir.iterdir():
+        entry.write_bytes(b"garbage")
+    FileCache(cache_dir=cache_dir).load(config_file, "json", parse)
+    assert len(parsed) == 4
+    FileCache(cache_dir=cache_dir).load(config_file, "json", parse)
+    assert len(parsed) == 4
+
+
+def test_file_cache_disk_untrusted(tmp_path: Path, config_file: Path) -> None:
+    cache_dir = tmp_path / "cache"
+    parsed: list[bytes] = []
+
+    def parse(data: Any) -> Any:
+        parsed.append(bytes(data))
+        return json.loads(data)
+
+    FileCache(cache_dir=cache_dir).load(config_file, "json", parse)
+    assert cache_dir.stat().st_mode & 0o777 == 0o700  # noqa: PLR2004
+
+    # Entries others could have written are not unpickled
+    (entry,) = cache_dir.iterdir()
+    entry.chmod(0o666)
+    cache = FileCache(cache_dir=cache_dir)
+    cache.load(config_file, "json", parse)
+    assert (cache.disk_hits, len(parsed)) == (0, 2)
+
+    entry.chmod(0o600)
+    cache_dir.chmod(0o777)
+    cache = FileCache(cache_dir=cache_dir)
+    cache.load(config_file, "json", parse)
+    assert (cache.disk_hits, len(parsed)) == (0, 3)
+
+    cache_dir.chmod(0o700)
+    cache = FileCache(cache_dir=cache_dir)
+    cache.load(config_file, "json", parse)
+    assert (cache.disk_hits, len(parsed)) == (1, 3)
+
+
+def test_file_cache_disk_unwritable(tmp_path: Path, config_file: Path) -> None:
+    cache_dir = tmp_path / "cache"
+    cache_dir.write_text("not a directory")
+
+    cache = FileCache(cache_dir=cache_dir)
+    assert cache.load(config_file, "json", json.loads)["voecfg_cache"]["name"] == "one"
+
+
+def test_file_cache_shared_between_configs(config_file: Path) -> None:
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_cache"
+        _config_path = json_file(config_file)
+        name: str
+
+    class voecfgTestConfig2(BaseConfig):
+        _prefix = "voecfg_cache"
+        _config_path = config_file
+        items: list[int]
+
+    hits = file_cache.info().hits
+    config = voecfgTestConfig()
+    config2 = voecfgTestConfig2()
+    config2.items.append(2)
+    assert config.name == "one"
+    assert voecfgTestConfig2().items == [1]
+    assert file_cache.info().hits == hits + 2
+
+    os.utime(config_file, ns=(0, 0))
+    assert voecfgTestConfig().name == "one"
+    assert file_cache.info().hits == hits + 2
+
+
+def test_register_file_type(tmp_path: Path) -> None:
+    class KeyValueFile(File):
+        parser = Parser(
+            "keyvalue",
+            lambda data: {
+                "voecfg_kv": dict(
+                    line.split("=", 1) for line in data.decode().splitlines()
+                ),
+            },
+            ValueError,
+        )
+        suffixes = (".kv",)
+        content_types = ("text/x-kv",)
+
+    register_file_type(KeyValueFile)
+    assert file_type_for_content_type("text/x-kv; charset=utf-8") is KeyValueFile
+    assert file_type_for_path("config.JSON") is JSONFile
+
+    path = tmp_path / "config.kv"
+    path.write_text("name=kv")
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_kv"
+        _config_path = path.as_posix()
+        name: str
+
+    assert voecfgTestConfig().name == "kv"
+
+
+def test_json_parser(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    # orjson is opt-in, since it would lose the precision of big integers
+    assert JSON_PARSER.name == "json"
+    path = tmp_path / "config.json"
+    path.write_text('{"voecfg": {"big": 123456789012345678901234567890}}')
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg"
+        _config_path = json_file(path)
+        big: int
+
+    assert voecfgTestConfig().big == 123456789012345678901234567890  # noqa: PLR2004
+
+    monkeypatch.setenv("VOECFG_JSON_PARSER", "json")
+    assert default_json_parser().name == "json"
+    monkeypatch.setenv("VOECFG_JSON_PARSER", "simdjson")
+    with pytest.raises(ValueError, match="Unknown VOECFG_JSON_PARSER"):
+        default_json_parser()
+
+    pytest.importorskip("orjson")
+    monkeypatch.setenv("VOECFG_JSON_PARSER", "orjson")
+    assert default_json_parser().name == "orjson"
+
+
+def test_toml_parser_missing(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(TOMLFile, "parser", None)
+
+    with pytest.raises(ImportError, match="A TOML parser"):
+        toml_file("config.toml")
+
+
+def test_select_toml() -> None:
+    assert TOML_PARSER is not None
+    document = b"""title = "root"
+
+[other]
+text = '''
+[voecfg]
+not = "a table"
+'''
+values = [
+  ["a"],
+]
+
+[voecfg]
+name = "selected"
+
+[voecfg.sub]
+value = 1
+
+[[voecfg.items]]
+id = 1
+
+["quoted"]
+x = { y = [1] }
+"""
+    assert select_toml(document, {"voecfg"}, TOML_PARSER.loads) == {
+        "voecfg": {"name": "selected", "sub": {"value": 1}, "items": [{"id": 1}]},
+    }
+    assert select_toml(document, {"quoted"}, TOML_PARSER.loads) == {
+        "quoted": {"x": {"y": [1]}},
+    }
+
+
+def test_selective_config(tmp_path: Path) -> None:
+    path = tmp_path / "config.toml"
+    path.write_text('[voecfg_sel]\nname = "toml"\n\n[broken]\nx = \n')
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_sel"
+        _config_path = path
+        _selective = True
+        name: str
+
+    assert voecfgTestConfig().name == "toml"
+
+
+def test_selective_config_json(tmp_path: Path) -> None:
+    path = tmp_path / "config.json"
+    path.write_text('{"voecfg_sel": {"name": "json"}, "other": {"x": [1]}}')
+
+    # JSON files are parsed whole, and shared with non-selective loads
+    shared = json_file(path).load_shared()
+    selected = json_file(path).load_keys(("voecfg_sel",))
+    assert selected == {"voecfg_sel": {"name": "json"}}
+    assert selected["voecfg_sel"] is not shared["voecfg_sel"]
+    assert json_file(path).load_shared() is shared
+
+
+def test_layered_config(tmp_path: Path) -> None:
+    base = tmp_path / "base.json"
+    base.write_text(
+        json.dumps(
+            {
+                "voecfg_layers": {
+                    "name": "base",
+                    "hosts": ["a", "b"],
+                    "db": {"host": "localhost", "port": 1},
+                },
+                "other": {"x": 1},
+            },
+        ),
+    )
+    override = tmp_path / "prod.json"
+    override.write_text(
+        json.dumps({"voecfg_layers": {"hosts": ["c"], "db": {"port": 2}}}),
+    )
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_layers"
+        _config_path = [base, str(override)]  # noqa: RUF012
+        name: str
+        hosts: list[str]
+        db: dict[str, Any]
+
+    config = voecfgTestConfig()
+    assert config.name == "base"
+    assert config.hosts == ["c"]
+    assert config.db == {"host": "localhost", "port": 2}
+
+    override.write_text(json.dumps({"voecfg_layers": {"name": "prod"}}))
+    os.utime(override, ns=(2, 2))
+    assert reload(config)
+    assert config.name == "prod"
+    assert config.hosts == ["a", "b"]
+    assert config.db == {"host": "localhost", "port": 1}
+
+
+def test_layered_file_memo(tmp_path: Path) -> None:
+    base = tmp_path / "base.json"
+    base.write_text(json.dumps({"a": {"x": 1}, "b": {"y": 1}}))
+    override = tmp_path / "override.json"
+    override.write_text(json.dumps({"b": {"z": 1}}))
+
+    layered = layered_file(base, override)
+    first = layered.load_shared()
+    assert first == {"a": {"x": 1}, "b": {"y": 1, "z": 1}}
+    assert layered.load() == first
+    assert layered.load() is not first
+
+    # Only the keys that changed are merged again
+    override.write_text(json.dumps({"b": {"z": 2}}))
+    os.utime(override, ns=(3, 3))
+    second = layered.load_shared()
+    assert second == {"a": {"x": 1}, "b": {"y": 1, "z": 2}}
+    assert second["a"] is first["a"]
+    assert second["b"] is not first["b"]
+
+    assert layered.load_keys(("b",)) == {"b": {"y": 1, "z": 2}}
+    assert layered.stamp() == (JSONFile(base).stamp(), JSONFile(override).stamp())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+import json
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any
+
+import pytest
+
+from voecfg import BaseConfig, FrozenConfig, SubConfig, freeze, json_file
+
+# ruff: noqa: N801
+
+
+@pytest.fixture
+def config_cls(tmp_path: Path) -> Any:
+    config_file = tmp_path / "config.json"
+    config_file.write_text(
+        json.dumps(
+            {
+                "voecfg_frozen": {
+                    "name": "one",
+                    "hosts": ["a", "b"],
+                    "limits": {"cpu": [1, 2]},
+                    "db": {"port": 1},
+                },
+            },
+        ),
+    )
+
+    class DBConfig(SubConfig):
+        _prefix = "db"
+        _lazy = True
+        port: int
+        path: Path = Path("/srv")
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_frozen"
+        _config_path = json_file(config_file)
+        name: str
+        hosts: list[str]
+        limits: dict[str, Any]
+        tags: set[str] = {"x"}  # noqa: RUF012
+        db = DBConfig()
+
+    return voecfgTestConfig
+
+
+def test_freeze(config_cls: Any) -> None:
+    config = config_cls()
+    frozen = freeze(config)
+
+    assert isinstance(frozen, FrozenConfig)
+    assert type(frozen).__name__ == "FrozenvoecfgTestConfig"
+    assert not hasattr(frozen, "__dict__")
+    assert frozen.name == "one"
+    assert frozen.hosts == ("a", "b")
+    assert isinstance(frozen.limits, MappingProxyType)
+    assert frozen.limits["cpu"] == (1, 2)
+    assert frozen.tags == frozenset({"x"})
+    assert frozen.db.port == 1
+    assert frozen.db.path == Path("/srv")
+
+    # The view class is generated once per config class
+    assert type(freeze(config_cls())) is type(frozen)
+    assert type(frozen.db) is not type(frozen)
+
+
+def test_freeze_immutable(config_cls: Any) -> None:
+    frozen = freeze(config_cls())
+
+    with pytest.raises(AttributeError, match="is frozen"):
+        frozen.name = "two"
+    with pytest.raises(AttributeError, match="is frozen"):
+        del frozen.db.port
+    with pytest.raises(TypeError):
+        frozen.limits["cpu"] = 1
+
+    # Later changes to the config don't show up in the view
+    config = config_cls()
+    frozen = freeze(config)
+    config.hosts.append("c")
+    assert frozen.hosts == ("a", "b")
+
+
+def test_freeze_hash_and_eq(config_cls: Any) -> None:
+    first = freeze(config_cls())
+    second = freeze(config_cls())
+
+    assert first == second
+    assert hash(first) == hash(second)
+    assert {first, second} == {first}
+    assert first != first.db
+    assert repr(first.db) == f"FrozenDBConfig(path={Path('/srv')!r}, port=1)"
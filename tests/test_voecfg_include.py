@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+import os
+import subprocess  # nosec B404
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+import voecfg
+from voecfg import (
+    BaseConfig,
+    Environ,
+    SubConfig,
+    aload,
+    check,
+    dump_json,
+    freeze,
+    from_snapshot,
+    json_file,
+    overlay,
+    snapshot,
+)
+
+# ruff: noqa: N801
+
+
+class DBConfig(SubConfig):
+    _prefix = "db"
+    host: str = "localhost"
+    port: int
+    password: str
+    # Missing, so loading it would fail
+    replicas: list[str] = json_file("missing.json")
+
+
+class QueueConfig(SubConfig):
+    _prefix = "queue"
+    size: int
+    routes: dict[str, int] = json_file("queue.json")
+
+
+class voecfgTestConfig(BaseConfig):
+    _prefix = "voecfg_include"
+    # Relative to tmp_path, see the config_file fixture
+    _config_path = json_file("config.json")
+    name: str
+    db = DBConfig()
+    queue = QueueConfig()
+
+
+@pytest.fixture
+def config_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "config.json"
+    path.write_text(
+        json.dumps({"voecfg_include": {"queue": {"size": 1}, "db": {"port": 2}}}),
+    )
+    (tmp_path / "queue.json").write_text('{"a": 1}')
+    monkeypatch.chdir(tmp_path)
+    return path
+
+
+@pytest.mark.parametrize(
+    ("compiled", "lazy"),
+    [(False, False), (True, False), (False, True)],
+)
+@pytest.mark.usefixtures("config_file")
+def test_include(
+    monkeypatch: pytest.MonkeyPatch,
+    compiled: bool,  # noqa: FBT001
+    lazy: bool,  # noqa: FBT001
+) -> None:
+    monkeypatch.setattr(voecfgTestConfig, "_compiled", compiled)
+    monkeypatch.setattr(voecfgTestConfig, "_lazy", lazy)
+
+    environ = Environ({"VOECFG_INCLUDE_QUEUE_SIZE": "3"})
+
+    assert check(voecfgTestConfig, environ=environ)
+
+    config = voecfgTestConfig(environ=environ, include=["queue", "db.port"])
+    assert config.queue.size == 3  # noqa: PLR2004
+    assert config.queue.routes == {"a": 1}
+    assert config.db.port == 2  # noqa: PLR2004
+
+    with pytest.raises(AttributeError, match=r"voecfgTestConfig\.name was not loaded"):
+        _ = config.name
+    with pytest.raises(AttributeError, match=r"DBConfig\.password was not loaded"):
+        _ = config.db.password
+    assert not hasattr(config.db, "replicas")
+
+    assert config.as_dict() == {
+        "voecfg_include": {
+            "db": {"port": 2},
+            "queue": {"size": 3, "routes": {"a": 1}},
+        },
+    }
+    assert json.loads(dump_json(config)) == config.as_dict()
+
+    # A full load of the same class is not affected
+    full = voecfgTestConfig(
+        environ=Environ(
+            {"VOECFG_INCLUDE_NAME": "a", "VOECFG_INCLUDE_DB_PASSWORD": "b"},
+        ),
+        include=["name", "queue", "db.host", "db.port", "db.password"],
+    )
+    assert (full.name, full.db.host, full.db.password) == ("a", "localhost", "b")
+
+
+@pytest.mark.usefixtures("config_file")
+def test_include_paths() -> None:
+    with pytest.raises(KeyError, match=r"db\.missing"):
+        voecfgTestConfig(include=["db.missing"])
+    with pytest.raises(KeyError, match=r"queue\.size\.real"):
+        voecfgTestConfig(include=["queue.size.real"])
+    with pytest.raises(TypeError, match="not a str"):
+        voecfgTestConfig(include="queue")
+    with pytest.raises(ValueError, match="Empty path"):
+        voecfgTestConfig(include=[""])
+
+    # A whole SubConfig wins over parts of it
+    config = voecfgTestConfig(include=["queue.size", "queue"])
+    assert config.queue.routes == {"a": 1}
+    config = voecfgTestConfig(include=["queue", "queue.size"])
+    assert config.queue.routes == {"a": 1}
+
+
+@pytest.mark.usefixtures("config_file")
+def test_include_derived() -> None:
+    config = voecfgTestConfig(include=["queue"])
+
+    assert [str(file.path) for file in config._watched_files()] == [  # noqa: SLF001
+        "config.json",
+        "queue.json",
+    ]
+
+    restored = from_snapshot(voecfgTestConfig, snapshot(config))
+    assert restored.queue.size == 1
+    with pytest.raises(AttributeError, match="not loaded"):
+        _ = restored.db
+
+    frozen = freeze(config)
+    assert frozen.queue.size == 1
+    assert "db" not in repr(frozen)
+    assert frozen == freeze(voecfgTestConfig(include=["queue"]))
+
+    derived = overlay(config, {"queue": {"size": 5}})
+    assert derived.queue.size == 5  # noqa: PLR2004
+    with pytest.raises(AttributeError, match="not loaded"):
+        overlay(config, {"name": "a"})
+
+
+@pytest.mark.usefixtures("config_file")
+def test_include_aload_check() -> None:
+    config = asyncio.run(aload(voecfgTestConfig, include=["queue"]))
+    assert config.queue.routes == {"a": 1}
+
+    assert check(voecfgTestConfig, include=["queue"]) == []
+    errors = check(voecfgTestConfig, include=["db.port", "db.password"])
+    assert [type(error) for error in errors] == [ValueError]
+    errors = check(voecfgTestConfig, include=["db"])
+    assert [type(error) for error in errors] == [FileNotFoundError]
+
+
+def test_include_other_process(tmp_path: Path) -> None:
+    (tmp_path / "voecfg_include_app.py").write_text(
+        textwrap.dedent(
+            """
+            from voecfg import BaseConfig, SubConfig
+
+            class DBConfig(SubConfig):
+                _prefix = "db"
+                host: str = "localhost"
+                port: int = 1
+
+            class App(BaseConfig):
+                _prefix = "voecfg_include_app"
+                name: str = "default"
+                db = DBConfig()
+            """,
+        ),
+    )
+    src = Path(voecfg.__file__).parent.parent
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join((str(src), str(tmp_path)))}
+
+    def run(code: str) -> str:
+        return subprocess.run(  # noqa: S603
+            [sys.executable, "-c", textwrap.dedent(code)],
+            cwd=tmp_path,
+            env=env,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+
+    run(
+        """
+        from pathlib import Path
+        from voecfg import snapshot
+        from voecfg_include_app import App
+
+        Path("blob").write_bytes(snapshot(App(include=["db.port"])))
+        """,
+    )
+
+    # Members left out are not loaded, even where App was never built
+    output = run(
+        """
+        from pathlib import Path
+        from voecfg import from_snapshot
+        from voecfg_include_app import App
+
+        restored = from_snapshot(App, Path("blob").read_bytes())
+        print(restored.db.port, hasattr(restored, "name"), hasattr(restored.db, "host"))
+        print(App().name, App().db.host)
+        """,
+    )
+    assert output.split() == ["1", "False", "False", "default", "localhost"]
+
+
+def test_subclass_after_load() -> None:
+    class voecfgBaseConfig(BaseConfig):
+        _prefix = "voecfg_include"
+        name: str
+        host: str = "localhost"
+
+    environ = {"VOECFG_INCLUDE_NAME": "a", "VOECFG_INCLUDE_EXTRA": "b"}
+    assert voecfgBaseConfig(environ=environ).name == "a"
+
+    class voecfgSubConfig(voecfgBaseConfig):
+        extra: str
+
+    config = voecfgSubConfig(environ=environ)
+    assert (config.extra, config.host) == ("b", "localhost")
+
+    # Fields without a default are still missing from the class, so a
+    # subclass defined after a load sees the same members as before one
+    assert not hasattr(voecfgBaseConfig, "name")
+    assert voecfgBaseConfig.host == "localhost"
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+from pathlib import Path
+
+import pytest
+
+from voecfg import BaseConfig, SubConfig, overlay
+
+# ruff: noqa: N801
+
+
+class DBConfig(SubConfig):
+    _prefix = "db"
+    host: str = "localhost"
+    pool_size: int = 10
+    path: Path = Path("/srv")
+
+
+class QueueConfig(SubConfig):
+    _prefix = "queue"
+    size: int = 1
+
+
+class voecfgTestConfig(BaseConfig):
+    _prefix = "voecfg_overlay"
+    name: str = "base"
+    hosts: list[str] = ["a"]  # noqa: RUF012
+    db = DBConfig()
+    queue = QueueConfig()
+
+
+def test_overlay() -> None:
+    base = voecfgTestConfig(environ={})
+    tenant = overlay(base, {"name": "tenant", "db": {"pool_size": 50, "path": "/x"}})
+
+    assert isinstance(tenant, type(base))
+    assert tenant.name == "tenant"
+    assert tenant.db.pool_size == 50
+    assert tenant.db.path == Path("/x")
+    assert tenant.db.host == "localhost"
+
+    # Unchanged values and SubConfigs are shared
+    assert tenant.hosts is base.hosts
+    assert tenant.queue is base.queue
+    assert tenant.db is not base.db
+
+    # The base is untouched
+    assert base.name == "base"
+    assert base.db.pool_size == 10
+    assert base.as_dict()["voecfg_overlay"]["db"]["pool_size"] == 10
+    assert tenant.as_dict()["voecfg_overlay"]["db"]["pool_size"] == 50
+
+    # Overlays of overlays
+    assert overlay(tenant, {"queue": {"size": 2}}).db.pool_size == 50
+
+
+def test_overlay_errors() -> None:
+    base = voecfgTestConfig(environ={})
+
+    with pytest.raises(TypeError, match=r"voecfgTestConfig\.DBConfig\.pool_size"):
+        overlay(base, {"db": {"pool_size": "50"}})
+
+    with pytest.raises(ValueError, match="VOECFG_OVERLAY_NAME not set"):
+        overlay(base, {"name": None})
+
+    with pytest.raises(KeyError, match="has no member nope"):
+        overlay(base, {"nope": 1})
+
+    with pytest.raises(TypeError, match="must be a dict"):
+        overlay(base, {"db": 1})
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from voecfg import (
+    BaseConfig,
+    ConfigHolder,
+    ConfigWatcher,
+    SubConfig,
+    json_file,
+    overlay,
+    reload,
+)
+
+# ruff: noqa: N801
+
+
+WriteJSON = Callable[[Path, Any, int], None]
+
+
+class DBConfig(SubConfig):
+    _prefix = "db"
+    port: int
+
+
+class QueueConfig(SubConfig):
+    _prefix = "queue"
+    size: int
+
+
+class voecfgTestConfig(BaseConfig):
+    _prefix = "voecfg_reload"
+    # Relative to tmp_path, see the files fixture
+    _config_path = json_file("config.json")
+    name: str
+    db = DBConfig()
+    queue = QueueConfig()
+    devices: dict[str, Any] = json_file("devices.json")
+
+
+@pytest.fixture
+def files(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    write_json: WriteJSON,
+) -> tuple[Path, Path]:
+    config_file = tmp_path / "config.json"
+    devices_file = tmp_path / "devices.json"
+    write_json(
+        config_file,
+        {"voecfg_reload": {"name": "one", "db": {"port": 1}, "queue": {"size": 1}}},
+        1,
+    )
+    write_json(devices_file, {"a": 1}, 1)
+    monkeypatch.chdir(tmp_path)
+    return config_file, devices_file
+
+
+def test_reload(files: tuple[Path, Path], write_json: WriteJSON) -> None:
+    config_file, devices_file = files
+
+    config = voecfgTestConfig()
+    db, queue = config.db, config.queue
+
+    assert reload(config) is False
+
+    write_json(
+        config_file,
+        {"voecfg_reload": {"name": "one", "db": {"port": 2}, "queue": {"size": 1}}},
+        2,
+    )
+    assert reload(config) is True
+    assert config.db.port == 2
+    assert config.db is not db
+    assert db.port == 1
+    assert config.queue is queue
+
+    write_json(devices_file, {"a": 2}, 2)
+    assert reload(config) is True
+    assert config.devices == {"a": 2}
+    assert config.queue is queue
+
+
+def test_watcher(files: tuple[Path, Path], write_json: WriteJSON) -> None:
+    config_file, devices_file = files
+
+    reloaded: list[Any] = []
+    config = voecfgTestConfig()
+    watcher = ConfigWatcher(config, on_reload=reloaded.append)
+
+    assert watcher.check() is False
+
+    write_json(
+        config_file,
+        {"voecfg_reload": {"name": "two", "db": {"port": 1}, "queue": {"size": 1}}},
+        2,
+    )
+    assert watcher.check() is True
+    assert config.name == "two"
+    assert reloaded == [config]
+
+    # Touched, but the contents are the same
+    os.utime(devices_file, ns=(3, 3))
+    assert watcher.check() is False
+
+
+def test_watcher_reload_field(tmp_path: Path, write_json: WriteJSON) -> None:
+    config_file = tmp_path / "config.json"
+    write_json(config_file, {"voecfg_reload": {"name": "one"}}, 1)
+
+    class voecfgFieldConfig(BaseConfig):
+        _prefix = "voecfg_reload"
+        _config_path = json_file(config_file)
+        name: str
+        reload: bool = True
+
+    config = voecfgFieldConfig()
+    watcher = ConfigWatcher(config)
+    write_json(config_file, {"voecfg_reload": {"name": "two"}}, 2)
+    assert watcher.check() is True
+    assert (config.name, config.reload) == ("two", True)
+
+
+def test_watcher_thread(files: tuple[Path, Path], write_json: WriteJSON) -> None:
+    _, devices_file = files
+
+    config = voecfgTestConfig()
+    watcher = ConfigWatcher(config, interval=0.01)
+    watcher.start()
+    try:
+        write_json(devices_file, {"a": 3}, 2)
+        for _ in range(500):
+            if config.devices == {"a": 3}:
+                break
+            time.sleep(0.01)
+    finally:
+        watcher.stop()
+
+    assert config.devices == {"a": 3}
+
+
+def test_holder(files: tuple[Path, Path], write_json: WriteJSON) -> None:
+    config_file, devices_file = files
+
+    holder = ConfigHolder(voecfgTestConfig)
+    first = holder.current
+    assert holder.generation == 1
+    assert holder.reload() is False
+
+    write_json(
+        config_file,
+        {"voecfg_reload": {"name": "two", "db": {"port": 2}, "queue": {"size": 1}}},
+        2,
+    )
+    assert holder.reload() is True
+    assert holder.generation == 2
+    second = holder.current
+    assert (second.name, second.db.port) == ("two", 2)
+    assert second.queue is first.queue
+
+    # Readers of the old generation are not disturbed
+    assert (first.name, first.db.port) == ("one", 1)
+
+    assert holder.refresh() is holder.current
+    assert holder.generation == 3
+
+    # A watched holder publishes the reloads
+    watcher = ConfigWatcher(holder)
+    write_json(devices_file, {"a": 2}, 2)
+    assert watcher.check() is True
+    assert holder.current.devices == {"a": 2}
+    assert holder.generation == 4
+
+
+def test_holder_consistent_reads() -> None:
+    class HostConfig(SubConfig):
+        _prefix = "db"
+        host: str = "a"
+        port: int = 1
+
+    class voecfgHolderConfig(BaseConfig):
+        _prefix = "voecfg_holder"
+        db = HostConfig()
+
+    holder = ConfigHolder(voecfgHolderConfig)
+    pairs = [("a", 1), ("b", 2)]
+    seen: set[tuple[str, int]] = set()
+    done = threading.Event()
+
+    def read() -> None:
+        while not done.is_set():
+            db = holder.current.db
+            seen.add((db.host, db.port))
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    try:
+        for i in range(200):
+            host, port = pairs[i % 2]
+            holder.publish(
+                overlay(holder.current, {"db": {"host": host, "port": port}}),
+            )
+    finally:
+        done.set()
+        for reader in readers:
+            reader.join()
+
+    assert seen <= set(pairs)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+import json
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from voecfg import BaseConfig, RemoteFile, remote_file
+from voecfg.remote import connection_pool
+
+# ruff: noqa: N801, N802
+
+
+class _Server(ThreadingHTTPServer):
+    document: bytes = b"{}"
+    etag: str = '"1"'
+    status: int = 200
+    requests: list[tuple[int, str | None]]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _Server
+
+    def do_GET(self) -> None:
+        server = self.server
+        server.requests.append(
+            (self.client_address[1], self.headers.get("If-None-Match")),
+        )
+        if server.status != 200:
+            self.send_response(server.status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if self.headers.get("If-None-Match") == server.etag:
+            self.send_response(304)
+            self.send_header("ETag", server.etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", server.etag)
+        self.send_header("Content-Length", str(len(server.document)))
+        self.end_headers()
+        self.wfile.write(server.document)
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[_Server]:
+    httpd = _Server(("127.0.0.1", 0), _Handler)
+    httpd.requests = []
+    httpd.document = json.dumps({"voecfg_remote": {"name": "one"}}).encode()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+    connection_pool.clear()
+
+
+def _url(server: _Server) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host!s}:{port}/config"
+
+
+def test_remote_file(server: _Server) -> None:
+    remote = remote_file(_url(server))
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_remote"
+        _config_path = remote
+        name: str
+
+    assert voecfgTestConfig().name == "one"
+    assert voecfgTestConfig().name == "one"
+
+    # The second load was a 304, over the same connection
+    (port, etag), (second_port, second_etag) = server.requests
+    assert etag is None
+    assert second_etag == '"1"'
+    assert second_port == port
+
+    server.document = json.dumps({"voecfg_remote": {"name": "two"}}).encode()
+    server.etag = '"2"'
+    assert voecfgTestConfig().name == "two"
+    assert remote.stamp() == '"2"'
+
+
+def test_remote_file_last_known_good(server: _Server, tmp_path: Path) -> None:
+    cache_path = tmp_path / "remote.json"
+    remote = RemoteFile(_url(server), cache_path=cache_path)
+    assert remote.load() == {"voecfg_remote": {"name": "one"}}
+    assert json.loads(cache_path.read_bytes()) == {"voecfg_remote": {"name": "one"}}
+
+    # Errors fall back to the copy in memory
+    server.status = 503
+    assert remote.load() == {"voecfg_remote": {"name": "one"}}
+
+    # and new processes to the copy on disk
+    assert RemoteFile(_url(server), cache_path=cache_path).load() == {
+        "voecfg_remote": {"name": "one"},
+    }
+
+    with pytest.raises(OSError, match="503"):
+        RemoteFile(_url(server)).load()
+
+    with pytest.raises(ValueError, match="Unsupported URL"):
+        RemoteFile("ftp://example.com/config.json")
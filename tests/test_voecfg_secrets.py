@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import time
+from pathlib import Path
+
+import pytest
+
+from voecfg import BaseConfig, SecretsDir, SubConfig
+
+# ruff: noqa: N801
+
+
+@pytest.fixture
+def secrets_dir(tmp_path: Path) -> Path:
+    path = tmp_path / "secrets"
+    path.mkdir()
+    (path / "voecfg_secrets_db_password").write_text("hunter2\n")
+    (path / "voecfg_secrets_db_port").write_text("5432")
+    (path / "..data").mkdir()
+    return path
+
+
+class DBConfig(SubConfig):
+    _prefix = "db"
+    password: str
+    port: int = 1
+    host: str = "localhost"
+
+
+def test_secrets_dir(secrets_dir: Path) -> None:
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_secrets"
+        _secrets_dir = secrets_dir
+        db = DBConfig()
+
+    config = voecfgTestConfig(environ={})
+    assert config.db.password == "hunter2"
+    assert config.db.port == 5432
+    assert config.db.host == "localhost"
+
+    # Environment variables win
+    class voecfgStrConfig(BaseConfig):
+        _prefix = "voecfg_secrets"
+        _secrets_dir = str(secrets_dir)
+        db = DBConfig()
+
+    str_config = voecfgStrConfig(environ={"VOECFG_SECRETS_DB_PORT": "1"})
+    assert str_config.db.port == 1
+
+
+def test_secrets_dir_lazy_reads(secrets_dir: Path) -> None:
+    secrets = SecretsDir(secrets_dir)
+    assert "VOECFG_SECRETS_DB_PASSWORD" in secrets
+    assert "..DATA" not in secrets
+    assert sorted(secrets) == ["VOECFG_SECRETS_DB_PASSWORD", "VOECFG_SECRETS_DB_PORT"]
+
+    # Files are read on lookup, and cached without a ttl
+    assert secrets["VOECFG_SECRETS_DB_PASSWORD"] == "hunter2"
+    (secrets_dir / "voecfg_secrets_db_password").write_text("rotated")
+    assert secrets["VOECFG_SECRETS_DB_PASSWORD"] == "hunter2"
+
+    # The index is only built once without a ttl
+    (secrets_dir / "voecfg_secrets_new").write_text("x")
+    assert "VOECFG_SECRETS_NEW" not in secrets
+
+    with pytest.raises(KeyError):
+        secrets["VOECFG_SECRETS_MISSING"]
+
+    assert len(SecretsDir(secrets_dir / "missing")) == 0
+
+
+def test_secrets_dir_ttl(secrets_dir: Path) -> None:
+    secrets = SecretsDir(secrets_dir, ttl=0.01)
+    assert secrets["VOECFG_SECRETS_DB_PASSWORD"] == "hunter2"
+
+    (secrets_dir / "voecfg_secrets_db_password").write_text("rotated")
+    (secrets_dir / "voecfg_secrets_new").write_text("x")
+    time.sleep(0.02)
+    assert secrets["VOECFG_SECRETS_DB_PASSWORD"] == "rotated"
+    assert "VOECFG_SECRETS_NEW" in secrets
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_secrets"
+        _secrets_dir = secrets
+        db = DBConfig()
+
+    config = voecfgTestConfig(environ={})
+    assert config.db.password == "rotated"
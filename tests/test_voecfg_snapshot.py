@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import pickle
+import subprocess  # nosec B404
+import sys
+import textwrap
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import voecfg
+from voecfg import (
+    BaseConfig,
+    SubConfig,
+    from_snapshot,
+    json_file,
+    reload,
+    snapshot,
+)
+
+# ruff: noqa: N801
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_snapshot(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    lazy: bool,  # noqa: FBT001
+) -> None:
+    config_file = tmp_path / "config.json"
+    config_file.write_text(
+        json.dumps({"voecfg_snapshot": {"name": "one", "db": {"port": 1}}}),
+    )
+    devices_file = tmp_path / "devices.json"
+    devices_file.write_text(json.dumps({"a": 1}))
+    monkeypatch.setenv("VOECFG_SNAPSHOT_TAGS", '["x", "y"]')
+
+    class DBConfig(SubConfig):
+        _prefix = "db"
+        _lazy = lazy
+        port: int
+        path: Path = Path("/tmp")  # noqa: S108
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_snapshot"
+        _config_path = json_file(config_file)
+        name: str
+        tags: list[str] = []  # noqa: RUF012
+        db = DBConfig()
+        devices: dict[str, Any] = json_file(devices_file)
+
+    config = voecfgTestConfig()
+    blob = snapshot(config)
+
+    # Restoring doesn't read any files or the environment
+    config_file.unlink()
+    devices_file.unlink()
+    monkeypatch.delenv("VOECFG_SNAPSHOT_TAGS")
+
+    restored = from_snapshot(voecfgTestConfig, blob)
+    assert isinstance(restored, voecfgTestConfig)
+    assert restored.as_dict() == config.as_dict()
+    assert restored.tags == ["x", "y"]
+    assert restored.db.port == 1
+    assert restored.db.path == Path("/tmp")  # noqa: S108
+    assert restored.devices == {"a": 1}
+    assert restored.db is not config.db
+
+    # Snapshots of restored configs are the same
+    assert (
+        from_snapshot(voecfgTestConfig, snapshot(restored)).as_dict()
+        == config.as_dict()
+    )
+
+    # The restored config reloads from the files of this process
+    config_file.write_text(
+        json.dumps({"voecfg_snapshot": {"name": "two", "db": {"port": 2}}}),
+    )
+    devices_file.write_text(json.dumps({"a": 1}))
+    assert reload(restored)
+    assert restored.name == "two"
+    assert restored.db.port == 2
+
+
+def test_snapshot_errors() -> None:
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_snapshot"
+        name: str = "one"
+
+    class voecfgOtherConfig(BaseConfig):
+        _prefix = "voecfg_other"
+
+    blob = snapshot(voecfgTestConfig())
+
+    with pytest.raises(ValueError, match="Snapshot is of"):
+        from_snapshot(voecfgOtherConfig, blob)
+
+    with pytest.raises(ValueError, match="Not a config snapshot"):
+        from_snapshot(voecfgOtherConfig, b"nope")
+
+    with pytest.raises(ValueError, match="Unsupported snapshot format"):
+        from_snapshot(voecfgOtherConfig, pickle.dumps(("other", 1, "x", {})))
+
+
+def test_snapshot_other_process(tmp_path: Path) -> None:
+    (tmp_path / "voecfg_snapshot_app.py").write_text(
+        textwrap.dedent(
+            """
+            from voecfg import BaseConfig, SubConfig
+
+            class QueueConfig(SubConfig):
+                _prefix = "q"
+                name: str = "default"
+
+            class App(BaseConfig):
+                _prefix = "voecfg_snapshot_app"
+                q = QueueConfig()
+            """,
+        ),
+    )
+    src = Path(voecfg.__file__).parent.parent
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join((str(src), str(tmp_path)))}
+
+    def run(code: str) -> str:
+        return subprocess.run(  # noqa: S603
+            [sys.executable, "-c", textwrap.dedent(code)],
+            cwd=tmp_path,
+            env=env,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+
+    run(
+        """
+        import os
+        from pathlib import Path
+        from voecfg import snapshot
+        from voecfg_snapshot_app import App
+
+        os.environ["VOECFG_SNAPSHOT_APP_Q_NAME"] = "jobs"
+        Path("blob").write_bytes(snapshot(App()))
+        """,
+    )
+
+    # A fresh process that has never built App restores the snapshot
+    output = run(
+        """
+        from pathlib import Path
+        from voecfg import from_snapshot
+        from voecfg_snapshot_app import App
+
+        restored = from_snapshot(App, Path("blob").read_bytes())
+        print(restored.q.name, App().q.name)
+        """,
+    )
+    assert output.split() == ["jobs", "default"]
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from voecfg import (
+    BaseConfig,
+    LoadTrace,
+    SubConfig,
+    file_cache,
+    json_file,
+    load_trace,
+)
+
+# ruff: noqa: N801
+
+
+@pytest.fixture
+def config_file(tmp_path: Path) -> Path:
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"voecfg_trace": {"name": "one", "db": {"port": 1}}}))
+    return path
+
+
+def test_trace_disabled(config_file: Path) -> None:
+    class DBConfig(SubConfig):
+        _prefix = "db"
+        port: int
+        host: str = "localhost"
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_trace"
+        _config_path = json_file(config_file)
+        name: str
+        workers: int = 1
+        db = DBConfig()
+
+    config = voecfgTestConfig()
+    assert load_trace(config) is None
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_trace(config_file: Path, compiled: bool) -> None:  # noqa: FBT001
+    file_cache.invalidate()
+
+    class DBConfig(SubConfig):
+        _prefix = "db"
+        port: int
+        host: str = "localhost"
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_trace"
+        _config_path = json_file(config_file)
+        _compiled = compiled
+        _trace = True
+        name: str
+        workers: int = 1
+        db = DBConfig()
+
+    environ = {"VOECFG_TRACE_WORKERS": "4", "VOECFG_TRACE_DB_HOST": "db"}
+    config = voecfgTestConfig(environ=environ)
+
+    # Tracing doesn't change the result
+    assert config.workers == 4
+    assert config.db.host == "db"
+    assert config.db.port == 1
+
+    trace = load_trace(config)
+    assert isinstance(trace, LoadTrace)
+    assert trace.name == "voecfgTestConfig"
+    for phase in ("schema", "config_file", "setup", "values", "parse"):
+        assert trace.phases[phase] >= 0
+    assert trace.phases["env_coercion"] >= 0
+    assert trace.phases["strict_checks"] >= 0
+    assert trace.total >= trace.phases["setup"]
+    assert list(trace.subconfigs) == ["voecfgTestConfig.db"]
+    assert trace.files_read == 1
+    assert trace.bytes_parsed == config_file.stat().st_size
+    assert trace.file_cache_hits == 0
+    # name, workers, db.port, db.host
+    assert trace.env_lookups == 4
+
+    report = trace.as_dict()
+    assert report["files_read"] == 1
+    assert report["subconfigs"] == trace.subconfigs
+    json.dumps(report)
+
+    # The second load is served from the file cache
+    trace = load_trace(voecfgTestConfig())
+    assert trace is not None
+    assert trace.files_read == 0
+    assert trace.file_cache_hits == 1
+
+
+def test_trace_callback(config_file: Path) -> None:
+    traces: list[LoadTrace] = []
+
+    def collect(trace: LoadTrace) -> None:
+        traces.append(trace)
+
+    class DBConfig(SubConfig):
+        _prefix = "db"
+        port: int
+        host: str = "localhost"
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_trace"
+        _config_path = json_file(config_file)
+        _trace = collect
+        name: str
+        workers: int = 1
+        db = DBConfig()
+
+    config = voecfgTestConfig()
+    assert traces == [load_trace(config)]
+
+
+def test_trace_compiled_loader(monkeypatch: pytest.MonkeyPatch) -> None:
+    class DBConfig(SubConfig):
+        _prefix = "db"
+        _compiled = True
+        port: int = 1
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg_trace"
+        _compiled = True
+        _trace = True
+        workers: int = 1
+        db = DBConfig()
+
+    # Compiled classes are traced through their generated loader
+    def interpreted(*_: Any) -> None:
+        raise AssertionError
+
+    monkeypatch.setattr(BaseConfig, "_setup_traced", interpreted)
+    monkeypatch.setattr(SubConfig, "_setup_traced", interpreted)
+    config = voecfgTestConfig(environ={"VOECFG_TRACE_DB_PORT": "2"})
+    assert config.db.port == 2  # noqa: PLR2004
+
+    trace = load_trace(config)
+    assert trace is not None
+    assert set(trace.phases) >= {"values", "env_coercion", "strict_checks"}
+    assert list(trace.subconfigs) == ["voecfgTestConfig.db"]
+    assert trace.env_lookups == 2  # noqa: PLR2004
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+from datetime import date, datetime, timedelta
+from enum import Enum
+from pathlib import Path
+from typing import Any, Literal, Optional, Union
+
+import pytest
+
+from voecfg import BaseConfig, SubConfig
+from voecfg.utils import get_checker, get_converter, load_from_environment
+
+# ruff: noqa: N801, UP007, UP045, DTZ001
+
+
+class Color(Enum):
+    RED = "red"
+    BLUE = "blue"
+
+
+class Level(Enum):
+    LOW = 1
+    HIGH = 2
+
+
+@pytest.mark.parametrize(
+    ("hint", "raw", "expected"),
+    [
+        (int, "3", 3),
+        (float, "0.5", 0.5),
+        (bool, "yes", True),
+        (bool, "no", False),
+        (bytes, "🐱", "🐱".encode()),
+        (str, "text", "text"),
+        (Path, "/tmp/x", Path("/tmp/x")),
+        (list, "[1, 2]", [1, 2]),
+        (list[int], '[1, "2"]', [1, 2]),
+        (list[Path], '["/a"]', [Path("/a")]),
+        (dict[str, float], '{"a": 1}', {"a": 1.0}),
+        (dict[str, Any], '{"a": [1]}', {"a": [1]}),
+        (tuple[int, ...], "[1, 2]", (1, 2)),
+        (tuple[int, str], '[1, "a"]', (1, "a")),
+        (set[int], "[1, 1]", {1}),
+        (frozenset[str], '["a"]', frozenset({"a"})),
+        (Optional[int], "4", 4),
+        (Union[int, str], "x", "x"),
+        (int | None, "5", 5),
+        (Literal["a", "b"], "b", "b"),
+        (Literal[1, 2], "2", 2),
+        (Color, "blue", Color.BLUE),
+        (Color, "RED", Color.RED),
+        (Level, "2", Level.HIGH),
+        (Level, "LOW", Level.LOW),
+        (
+            datetime,
+            "2024-01-02T03:04:05",
+            datetime(2024, 1, 2, 3, 4, 5),
+        ),
+        (date, "2024-01-02", date(2024, 1, 2)),
+        (timedelta, "90", timedelta(seconds=90)),
+        (timedelta, "1 day, 2:03:04", timedelta(days=1, hours=2, minutes=3, seconds=4)),
+        (timedelta, "-0:00:01.5", timedelta(seconds=-1.5)),
+    ],
+)
+def test_get_converter(hint: Any, raw: str, expected: Any) -> None:
+    assert get_converter(hint)(raw) == expected
+
+
+@pytest.mark.parametrize(
+    ("hint", "raw"),
+    [
+        (Literal["a", "b"], "c"),
+        (Color, "green"),
+        (timedelta, "soon"),
+        (tuple[int, int], "[1]"),
+    ],
+)
+def test_get_converter_invalid(hint: Any, raw: str) -> None:
+    with pytest.raises(ValueError):  # noqa: PT011
+        get_converter(hint)(raw)
+
+
+def test_get_converter_cached() -> None:
+    assert get_converter(list[int]) is get_converter(list[int])
+    assert get_checker(Path) is get_checker(Path)
+
+
+def test_load_from_environment_json_error() -> None:
+    with pytest.raises(ValueError, match="Could not parse KEY as JSON"):
+        load_from_environment(list[int], "KEY", {"KEY": "[1,"})
+
+
+def test_get_checker() -> None:
+    assert get_checker(Any) is None
+    assert get_checker(Path)("/a") == Path("/a")  # type: ignore[misc]
+    assert get_checker(tuple[int, ...])([1]) == (1,)  # type: ignore[misc]
+    assert get_checker(Optional[int])(1) == 1  # type: ignore[misc]
+    assert get_checker(Color)("red") is Color.RED  # type: ignore[misc]
+
+    with pytest.raises(TypeError):
+        get_checker(Literal["a"])("b")  # type: ignore[misc]
+    with pytest.raises(TypeError):
+        get_checker(Optional[int])("1")  # type: ignore[misc]
+
+
+def test_rich_types_config() -> None:
+    class RichConfig(SubConfig):
+        _prefix = "rich"
+        _compiled = True
+        ports: list[int]
+        color: Color = Color.RED
+        mode: Literal["fast", "slow"] = "fast"
+        timeout: Optional[float] = None
+        retry_after: timedelta
+
+    class voecfgTestConfig(BaseConfig):
+        _prefix = "voecfg"
+        rich = RichConfig()
+        level: Level = Level.LOW
+        started: datetime
+
+    environ = {
+        "VOECFG_RICH_PORTS": '["80", 443]',
+        "VOECFG_RICH_COLOR": "blue",
+        "VOECFG_RICH_TIMEOUT": "1.5",
+        "VOECFG_RICH_RETRY_AFTER": "0:01:00",
+        "VOECFG_LEVEL": "HIGH",
+        "VOECFG_STARTED": "2024-01-02T03:04:05",
+    }
+    config = voecfgTestConfig(environ=environ)
+    assert config.rich.ports == [80, 443]
+    assert config.rich.color is Color.BLUE
+    assert config.rich.mode == "fast"
+    assert config.rich.timeout == 1.5
+    assert config.rich.retry_after == timedelta(minutes=1)
+    assert config.level is Level.HIGH
+    assert config.started == datetime(2024, 1, 2, 3, 4, 5)
+
+    with pytest.raises(ValueError, match="'medium' is not one of"):
+        voecfgTestConfig(environ={**environ, "VOECFG_RICH_MODE": "medium"})
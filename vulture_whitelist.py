@@ -1 +1,35 @@
-SubConfig
\ No newline at end of file
+SubConfig
+
+# Public API, used by applications rather than by the package itself
+ConfigWatcher
+aload
+dump_json
+dump_toml
+from_snapshot
+info
+invalidate
+iter_items
+json_file
+layered_file
+load_from_environment
+load_trace
+refresh
+remote_file
+snapshot
+stop
+toml_file
+
+# Read by users and tests
+currsize
+disk_hits
+
+# Kept for subclasses written against older versions
+_type_hints
+
+# Read back through __dict__ or getattr with a string
+_lazy_state
+_load_trace
+_voecfg_frozen
+_voecfg_layers
+_voecfg_schema
+_voecfg_secrets_dir